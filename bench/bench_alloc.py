@@ -0,0 +1,112 @@
+"""
+Per-command allocation with tracemalloc: shared snapshot frame vs the old
+read_excel_cached() that handed every caller a deep copy. Result cache,
+in-flight sharing and warm pages are off so every command does its work.
+
+    python bench/bench_alloc.py
+"""
+import os, sys, copy, asyncio, random, tracemalloc, builtins
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import main
+from coalesce import ResultCache
+from outbound import SendScheduler
+
+# Fake channels have no Discord limits; the benches time the bot's own work
+UNTHROTTLED = dict(global_limit=(10**9, 1.0), channel_limit=(10**9, 1.0))
+
+COMMANDS = [
+    "!o;p",
+    "!o;n;Tejm",
+    "!o;t;Twin",
+    "!o;e;Tejm",
+    "!o;i;B",
+    "!o;d;B",
+    "!o;s;B",
+    "x!p;Tejm",
+    "x!t;Former",
+]
+
+
+class FakeMessage:
+    async def edit(self, **kwargs):
+        pass
+
+
+class FakeChannel:
+    async def send(self, **kwargs):
+        return FakeMessage()
+
+
+class FakeAuthor:
+    name = "bench"
+    id = 0
+    bot = False
+
+
+class FakeCommand:
+    def __init__(self, content):
+        self.content = content
+        self.channel = FakeChannel()
+        self.author = FakeAuthor()
+
+
+async def _noop(*args, **kwargs):
+    pass
+
+
+async def measure(content):
+    random.seed(0)
+    msg = FakeCommand(content)
+    tracemalloc.start()
+    await main.process_olympus_command(msg, bypass_cooldown=True)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+async def run():
+    main.bot.process_commands = _noop
+    main.SENDS = SendScheduler(**UNTHROTTLED)
+    main.maybe_send_random_message = _noop
+    main.RESULTS = ResultCache(maxbytes=0)
+    main.FLIGHTS.enabled = False
+    shared = main.get_snapshot
+    snap = await shared()
+    snap.warm_pages = {}
+
+    async def copying():
+        # What every command used to get: a deep copy of the frame
+        clone = copy.copy(snap)
+        clone.frame = snap.frame.copy(deep=True)
+        return clone
+
+    rows = []
+    for content in COMMANDS:
+        main.get_snapshot = copying
+        before = await measure(content)
+        main.get_snapshot = shared
+        after = await measure(content)
+        rows.append((content, before, after))
+    return rows
+
+
+def report():
+    _print = builtins.print
+    builtins.print = lambda *a, **k: None  # handlers log every command
+    try:
+        rows = asyncio.run(run())
+    finally:
+        builtins.print = _print
+
+    print(f"{'command':<14} {'copy KB':>9} {'shared KB':>10} {'saved':>7}")
+    for content, before, after in rows:
+        saved = 1 - after / before if before else 0
+        print(f"{content:<14} {before / 1024:>9.0f} {after / 1024:>10.0f} {saved:>7.0%}")
+
+
+if __name__ == "__main__":
+    report()
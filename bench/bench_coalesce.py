@@ -0,0 +1,79 @@
+"""
+A burst of identical commands, like a channel reacting to a new record:
+how many computations run and how long the burst takes, with and
+without single-flight coalescing (main.FLIGHTS).
+
+    python bench/bench_coalesce.py [copies]
+"""
+import os, sys, time, asyncio, random, builtins
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import main
+from coalesce import ResultCache
+from outbound import SendScheduler
+from bench_alloc import UNTHROTTLED, FakeCommand, _noop
+
+COMMANDS = ["!o;t;Twin", "!o;n;Tejm", "!o;p;>2025-06-01", "!o;nt;Tejm;Former", "x!Twin"]
+
+
+async def burst(content, copies):
+    computed = 0
+    run_compute = main.run_compute
+
+    async def counting(fn, *args, **kwargs):
+        nonlocal computed
+        computed += 1
+        return await run_compute(fn, *args, **kwargs)
+
+    main.run_compute = counting
+    try:
+        t = time.perf_counter()
+        await asyncio.gather(*(
+            main.process_olympus_command(FakeCommand(content), bypass_cooldown=True)
+            for _ in range(copies)
+        ))
+        return (time.perf_counter() - t) * 1000, computed
+    finally:
+        main.run_compute = run_compute
+
+
+async def run(copies):
+    main.bot.process_commands = _noop
+    main.SENDS = SendScheduler(**UNTHROTTLED)
+    main.maybe_send_random_message = _noop
+    await main.get_snapshot()
+    # Nothing kept between bursts: only in-flight sharing counts here
+    main.RESULTS = ResultCache(maxbytes=0)
+    rows = []
+    for content in COMMANDS:
+        row = [content]
+        for enabled in (False, True):
+            main.FLIGHTS.enabled = enabled
+            random.seed(0)
+            await burst(content, 1)  # warm caches
+            row += await burst(content, copies)
+        rows.append(row)
+    main.FLIGHTS.enabled = True
+    return rows
+
+
+def report():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    _print = builtins.print
+    builtins.print = lambda *a, **k: None  # handlers log every command
+    try:
+        rows = asyncio.run(run(copies))
+    finally:
+        builtins.print = _print
+
+    print(f"{copies} identical requests at once, {main.COMPUTE_WORKERS} compute workers")
+    print(f"{'command':<20} {'off ms':>8} {'runs':>5} {'on ms':>8} {'runs':>5}")
+    for content, off_ms, off_runs, on_ms, on_runs in rows:
+        print(f"{content:<20} {off_ms:>8.1f} {off_runs:>5} {on_ms:>8.1f} {on_runs:>5}")
+
+
+if __name__ == "__main__":
+    report()
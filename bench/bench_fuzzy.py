@@ -0,0 +1,66 @@
+"""
+"Did you mean" lookups: difflib.get_close_matches vs FuzzyIndex.
+
+Synthetic player-like names at 1k / 10k / 100k. Every query is checked
+to give the same list as difflib at the cutoffs the bot uses
+(0.5 x!, 0.6 default, 0.65 o;, 0.7 branches).
+
+    python bench/bench_fuzzy.py [queries]
+"""
+import os, sys, time, random, string
+from difflib import get_close_matches
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fuzzy import FuzzyIndex
+
+SIZES = (1_000, 10_000, 100_000)
+CUTOFFS = (0.5, 0.6, 0.65, 0.7)
+ALPHABET = string.ascii_lowercase + string.digits + " _"
+
+
+def make_names(count, rng):
+    names = set()
+    while len(names) < count:
+        length = rng.randint(3, 14)
+        names.add("".join(rng.choice(ALPHABET) for _ in range(length)))
+    return sorted(names)
+
+
+def typo(word, rng):
+    """Drop, swap or change one character, like a user would."""
+    if len(word) < 2:
+        return word
+    i = rng.randrange(len(word) - 1)
+    action = rng.randrange(3)
+    if action == 0:
+        return word[:i] + word[i + 1:]
+    if action == 1:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + rng.choice(ALPHABET) + word[i + 1:]
+
+
+def timed(fn, queries):
+    t = time.perf_counter()
+    out = [fn(q) for q in queries]
+    return (time.perf_counter() - t) * 1000 / len(queries), out
+
+
+def main():
+    n_queries = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    rng = random.Random(0)
+    print(f"{'names':>7} {'cutoff':>6} {'build ms':>9} {'difflib ms/q':>13} {'index ms/q':>11} {'speedup':>8}")
+    for size in SIZES:
+        names = make_names(size, rng)
+        t = time.perf_counter()
+        index = FuzzyIndex(names)
+        build_ms = (time.perf_counter() - t) * 1000
+        queries = [typo(rng.choice(names), rng) for _ in range(n_queries)]
+        for cutoff in CUTOFFS:
+            slow, expected = timed(lambda q: get_close_matches(q, names, 5, cutoff), queries)
+            fast, got = timed(lambda q: index.close_matches(q, 5, cutoff), queries)
+            assert got == expected, f"mismatch at {size} names, cutoff {cutoff}"
+            print(f"{size:>7} {cutoff:>6} {build_ms:>9.1f} {slow:>13.2f} {fast:>11.2f} {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Event-loop lag while commands run: pandas/render work inline on the loop
+vs on the compute pool (main.run_compute).
+
+A ticker sleeps 1 ms at a time and records how late it wakes up; that
+lateness is what heartbeats and every other guild's commands see.
+Result cache, in-flight sharing and warm pages are off so every command
+does its full work in both modes.
+
+    python bench/bench_loop.py [rounds]
+"""
+import os, sys, time, asyncio, random, builtins
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import numpy as np
+import main
+from coalesce import ResultCache
+from outbound import SendScheduler
+from bench_alloc import UNTHROTTLED, COMMANDS, FakeCommand, _noop
+
+TICK = 0.001
+
+
+async def ticker(stop, lags):
+    while not stop.is_set():
+        t = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - t - TICK)
+
+
+async def measure(rounds):
+    lags = []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(stop, lags))
+    await asyncio.sleep(0.05)
+    lags.clear()
+    t = time.perf_counter()
+    for _ in range(rounds):
+        # One burst: every command at once, like a busy channel
+        await asyncio.gather(*(
+            main.process_olympus_command(FakeCommand(c), bypass_cooldown=True)
+            for c in COMMANDS
+        ))
+    wall = time.perf_counter() - t
+    stop.set()
+    await tick
+    return wall, np.array(lags) * 1000
+
+
+async def run(rounds):
+    main.bot.process_commands = _noop
+    main.SENDS = SendScheduler(**UNTHROTTLED)
+    main.maybe_send_random_message = _noop
+    main.RESULTS = ResultCache(maxbytes=0)
+    main.FLIGHTS.enabled = False
+    snap = await main.get_snapshot()
+    snap.warm_pages = {}
+    pool = main.COMPUTE_POOL
+    rows = []
+    for label, compute_pool in (("inline", None), ("pool", pool)):
+        main.COMPUTE_POOL = compute_pool
+        random.seed(0)
+        await measure(1)  # warm caches
+        rows.append((label,) + await measure(rounds))
+    main.COMPUTE_POOL = pool
+    return rows
+
+
+def report():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    _print = builtins.print
+    builtins.print = lambda *a, **k: None  # handlers log every command
+    try:
+        rows = asyncio.run(run(rounds))
+    finally:
+        builtins.print = _print
+
+    print(f"{rounds} bursts of {len(COMMANDS)} commands, {main.COMPUTE_WORKERS} workers")
+    print(f"{'mode':<7} {'wall s':>7} {'ticks':>6} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7}")
+    for label, wall, lags in rows:
+        p50, p99 = np.percentile(lags, [50, 99])
+        print(f"{label:<7} {wall:>7.2f} {len(lags):>6} {p50:>7.2f} {p99:>7.2f} {lags.max():>7.2f}")
+
+
+if __name__ == "__main__":
+    report()
@@ -0,0 +1,134 @@
+"""
+Per-page table render time: the old per-cell dataframe_to_markdown_aligned
+vs the column-wise one in main.py, with and without the snapshot's
+pre-formatted cells. Every page is also checked to render byte-identically.
+
+    python bench/bench_render.py [repeats]
+"""
+import os, sys, time, asyncio
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import numpy as np
+import pandas as pd
+from wcwidth import wcswidth
+import main
+from render import FIRST_COLUMN, shorten_name
+
+
+def legacy_render(df, shorten_tank=True):
+    """dataframe_to_markdown_aligned as it was before the rewrite."""
+    df = df.copy()
+
+    if FIRST_COLUMN in df.columns:
+        df[FIRST_COLUMN] = df[FIRST_COLUMN].apply(
+            lambda v: f"{float(v) / 1_000_000:,.3f} M"
+        )
+
+    if "Date" in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df["Date"]):
+            df["Date"] = df["Date"].dt.strftime("%Y-%m-%d").fillna("???")
+        else:
+            df["Date"] = df["Date"].astype(str).str[:10]
+
+    if "Name" in df.columns:
+        df["Name"] = df["Name"].apply(lambda n: shorten_name(n, 10))
+
+    if shorten_tank and "Tank" in df.columns:
+        df["Tank"] = (
+            df["Tank"]
+            .astype(str)
+            .str.lower()
+            .replace({"triple": "t", "auto": "a", "hexa": "h"}, regex=True)
+            .str.title()
+            .str[:8]
+        )
+
+    rows = [df.columns.tolist()] + df.values.tolist()
+    widths = [max(wcswidth(str(r[i])) for r in rows) for i in range(len(df.columns))]
+
+    def fmt(row):
+        return " " + " | ".join(
+            str(v) + " " * (widths[i] - wcswidth(str(v)))
+            for i, v in enumerate(row)
+        ) + " "
+
+    return (
+        [fmt(df.columns)]
+        + ["-" + "-".join("-" * w for w in widths) + " -"]
+        + [fmt(r) for r in df.values]
+    )
+
+
+def pages(snap):
+    """
+    (label, frame, shorten_tank, from_snapshot) for the tables commands
+    actually send. from_snapshot frames are indexed by snapshot position.
+    """
+    ordered = main.add_index(snap.rows(snap.ordered()))
+    out = []
+    for start in range(0, min(len(ordered), 300), 15):
+        out.append(("leaderboard", ordered.iloc[start:start + 15][main.COLUMNS_DEFAULT], True, True))
+    player = main.add_index(main.handle_name(snap, "Tejm"))
+    out.append(("!o;n", player[["Ņ", "Tank", "Score", "Date", "Id"]].head(20), True, True))
+    out.append(("!o;e", player[["Ņ", "Score", "Tank", "LB", "Tank LB", "Id"]].head(20), True, True))
+    totals = snap.totals.head(15).assign(**{"Ņ": range(1, 16)})
+    out.append(("!o;cu15", totals[["Ņ", "Name", "Score", "Fave"]], True, False))
+    out.append(("!o;ra", ordered.sample(10, random_state=0)[main.COLUMNS_DEFAULT], False, True))
+    return out
+
+
+def edge_frames():
+    """Odd cells: NaN/NaT, wide and zero-width characters, text dates."""
+    return [
+        pd.DataFrame({
+            "Ņ": [1, 2, 3, 4],
+            "Score": [0, 1_234_567, 999_999_999, 5],
+            "Name": ["  Spaced  ", float("nan"), "名前テスト名前テスト名", "é​"],
+            "Tank": ["Triple Auto-Hexa", None, "auto tripleauto", "Ünïcödé Tank"],
+            "Date": pd.to_datetime(["2024-01-02", None, "1999-12-31 23:59", "2030-06-06"], format="mixed"),
+            "Id": ["a\tb", "Qr", "", "🎉"],
+        }),
+        pd.DataFrame({"Ņ": [1], "Score": [10.5], "Date": ["2024-01-02 10:11:12"]}),
+        pd.DataFrame({"Ņ": [], "Score": [], "Name": []}),
+    ]
+
+
+def main_bench():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    snap = asyncio.run(main.get_snapshot())
+    cases = pages(snap) + [("edge", f, t, False) for f in edge_frames() for t in (True, False)]
+    render = main.dataframe_to_markdown_aligned
+    for label, frame, shorten, from_snap in cases:
+        expected = legacy_render(frame, shorten)
+        assert render(frame, shorten) == expected, label
+        if from_snap:
+            assert render(frame, shorten, snap) == expected, label
+
+    timings = {}
+    for label, frame, shorten, from_snap in cases:
+        runs = [
+            ("old", lambda: legacy_render(frame, shorten)),
+            ("new", lambda: render(frame, shorten)),
+            # Pre-formatted cells only exist for snapshot rows
+            ("snap", lambda: render(frame, shorten, snap if from_snap else None)),
+        ]
+        for name, fn in runs:
+            t = time.perf_counter()
+            for _ in range(repeats):
+                fn()
+            timings.setdefault(label, {}).setdefault(name, []).append(
+                (time.perf_counter() - t) / repeats * 1e6
+            )
+
+    print(f"{len(cases)} pages byte-identical")
+    print(f"{'table':<12} {'pages':>5} {'old us':>8} {'new us':>8} {'snap us':>8} {'speedup':>8}")
+    for label, t in timings.items():
+        old, new, pre = (np.mean(t[k]) for k in ("old", "new", "snap"))
+        print(f"{label:<12} {len(t['old']):>5} {old:>8.0f} {new:>8.0f} {pre:>8.0f} {old / pre:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,79 @@
+"""
+Result cache over a repeat-heavy stream: players and tanks drawn with a
+Zipf-like skew, one command at a time. Per-command time with no cache,
+a small cache and the default one, plus hit rate and evictions.
+
+    python bench/bench_results.py [commands]
+"""
+import os, sys, time, asyncio, random, builtins
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import main
+from coalesce import ResultCache
+from outbound import SendScheduler
+from bench_alloc import UNTHROTTLED, FakeCommand, _noop
+
+TEMPLATES = ["!o;n;{name}", "!o;e;{name}", "!o;re;{name}", "!o;t;{tank}", "x!{tank}", "!o;w;{nu}"]
+CACHES = (("off", 0), ("1 MB", 1), ("64 MB", 64))
+
+
+def stream(snap, count, rng):
+    names = sorted(snap.vocab.names.values())
+    tanks = sorted(snap.vocab.tanks.values())
+    rng.shuffle(names)
+    rng.shuffle(tanks)
+
+    def skewed(values):
+        # Weight 1/rank: a few popular players and tanks, a long tail
+        return rng.choices(values, weights=[1 / (i + 1) for i in range(len(values))])[0]
+
+    out = []
+    for _ in range(count):
+        nu = rng.randrange(1, 200)
+        out.append(rng.choice(TEMPLATES).format(
+            name=skewed(names), tank=skewed(tanks), nu=f"{nu}-{nu + 10}"
+        ))
+    return out
+
+
+async def run(count):
+    main.bot.process_commands = _noop
+    main.SENDS = SendScheduler(**UNTHROTTLED)
+    main.maybe_send_random_message = _noop
+    snap = await main.get_snapshot()
+    commands = stream(snap, count, random.Random(0))
+    rows = []
+    for label, mb in CACHES:
+        main.RESULTS = cache = ResultCache(maxbytes=mb * 1024 * 1024)
+        random.seed(0)
+        t = time.perf_counter()
+        for content in commands:
+            await main.process_olympus_command(FakeCommand(content), bypass_cooldown=True)
+        ms = (time.perf_counter() - t) * 1000 / len(commands)
+        rows.append((label, ms, cache.stats()))
+    return rows
+
+
+def report():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    _print = builtins.print
+    builtins.print = lambda *a, **k: None  # handlers log every command
+    try:
+        rows = asyncio.run(run(count))
+    finally:
+        builtins.print = _print
+
+    print(f"{count} commands, skewed over players/tanks")
+    print(f"{'cache':<6} {'ms/cmd':>7} {'hit rate':>9} {'entries':>8} {'MB':>6} {'evicted':>8} {'too big':>8}")
+    for label, ms, st in rows:
+        print(
+            f"{label:<6} {ms:>7.2f} {st['hit_rate']:>9.0%} {st['size']:>8} "
+            f"{st['bytes'] / 2**20:>6.2f} {st['evictions']:>8} {st['rejected']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    report()
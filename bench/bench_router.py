@@ -0,0 +1,79 @@
+"""
+Per-message dispatch overhead: parsing into a Command plus the route
+lookup, and the whole process_olympus_command path up to a handler that
+does nothing.
+
+    python bench/bench_router.py [repeats]
+"""
+import os, sys, time, asyncio, builtins
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import main
+from router import PREFIX
+from outbound import SendScheduler
+from bench_alloc import UNTHROTTLED, FakeCommand, _noop
+
+MESSAGES = [
+    "!o;p",
+    "!o;p;16-30",
+    "!o;n;Tejm;a;5-10",
+    "!o;t;Twin;>2025-06-01",
+    "!o;nt;Tejm;Former",
+    "!o;e;Frisbee;<01-06-2025;r",
+    "!o;zzz",
+    "x!Tejm",
+    "x!p;Tejm;5-10",
+    "hello there",
+]
+
+
+def time_parse(repeats):
+    parse = main.ROUTER.parse
+    t = time.perf_counter()
+    for _ in range(repeats):
+        for content in MESSAGES:
+            parse(content)
+    return (time.perf_counter() - t) / (repeats * len(MESSAGES)) * 1e6
+
+
+async def time_dispatch(repeats):
+    calls = []
+
+    @main.ROUTER.command(PREFIX, "bench", gt=True)
+    async def cmd_bench(message, snap, command, mask=None):
+        calls.append(command.name)
+
+    await main.get_snapshot()
+    messages = [FakeCommand(c) for c in ("!o;bench", "!o;bench;a;1-5", "!o;bench;>2025-06-01")]
+    t = time.perf_counter()
+    for _ in range(repeats):
+        for msg in messages:
+            await main.process_olympus_command(msg, bypass_cooldown=True)
+    elapsed = time.perf_counter() - t
+    del main.ROUTER.routes[(PREFIX, "bench")]
+    assert len(calls) == repeats * len(messages)
+    return elapsed / len(calls) * 1e6
+
+
+def report():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    main.bot.process_commands = _noop
+    main.SENDS = SendScheduler(**UNTHROTTLED)
+    _print = builtins.print
+    builtins.print = lambda *a, **k: None  # handlers log every command
+    try:
+        parse_us = time_parse(repeats)
+        dispatch_us = asyncio.run(time_dispatch(repeats // 10 or 1))
+    finally:
+        builtins.print = _print
+
+    print(f"{len(main.ROUTER.routes)} routes")
+    print(f"parse + route lookup      {parse_us:>8.2f} us/message")
+    print(f"dispatch to a no-op route {dispatch_us:>8.2f} us/message (date/GT masks included)")
+
+
+if __name__ == "__main__":
+    report()
@@ -0,0 +1,356 @@
+"""
+Outbound sends against a local mock of Discord's REST API that answers
+429s the way Discord does (X-RateLimit-* headers, JSON retry_after,
+global flag) and can pretend to be a Cloudflare block (HTML 429).
+
+Runs the old safe_send (sleep retry_after once, then give up) and the
+SendScheduler through the same bursts and checks the scheduler:
+  - delivers every message, in order per channel
+  - learns the channel limit from the headers
+  - answers an interaction ahead of a full channel queue
+  - merges queued edits of one message into the newest
+  - keeps edits of many messages in one channel under the channel's
+    edit limit, learned from PATCH responses
+  - learns an interaction's limit from its callback's headers
+  - pauses everything on a Cloudflare block instead of hammering it
+
+The mock raises every 429 straight to the caller. discord.py's own HTTP
+client sleeps and retries most 429s itself, so against the real API the
+old safe_send sees far fewer of them; the 429 counts here show what each
+sender would do with no retries underneath, not live traffic.
+
+    python bench/bench_send.py
+"""
+import os, sys, time, asyncio, builtins, itertools
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import aiohttp
+from aiohttp import web
+from discord.errors import HTTPException
+from outbound import SendScheduler
+
+CHANNEL_LIMIT = (5, 1.0)   # what the mock enforces per channel
+GLOBAL_LIMIT = (50, 1.0)
+CHANNELS = 6
+PER_CHANNEL = 15
+
+
+class MockDiscord:
+    """Per-channel and global fixed windows, like Discord's buckets."""
+
+    def __init__(self):
+        self.windows = {}
+        self.received = {}      # channel -> [content, ...] accepted in order
+        self.edits = {}         # message id -> [content, ...]
+        self.interactions = []  # arrival times
+        self.too_many = 0
+        self.cloudflare_until = 0.0
+        self.cloudflare_hits = 0
+        self.ids = itertools.count(1)
+
+    def window(self, key, limit, per):
+        now = time.monotonic()
+        start, used = self.windows.get(key, (now, 0))
+        if now - start >= per:
+            start, used = now, 0
+        self.windows[key] = (start, used + 1)
+        return limit - used - 1, per - (now - start)
+
+    def limited(self, bucket, limit, per):
+        remaining, reset_after = self.window(bucket, limit, per)
+        g_remaining, g_reset = self.window("global", *GLOBAL_LIMIT)
+        headers = {
+            "Via": "1.1 google",
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(max(remaining, 0)),
+            "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+            "X-RateLimit-Bucket": str(bucket),
+        }
+        if g_remaining < 0:
+            self.too_many += 1
+            headers.update({"X-RateLimit-Global": "true", "X-RateLimit-Scope": "global",
+                            "Retry-After": f"{g_reset:.3f}", "X-RateLimit-Reset-After": f"{g_reset:.3f}"})
+            return web.json_response(
+                {"message": "You are being rate limited.", "retry_after": g_reset, "global": True},
+                status=429, headers=headers
+            )
+        if remaining < 0:
+            self.too_many += 1
+            headers.update({"X-RateLimit-Scope": "user", "Retry-After": f"{reset_after:.3f}"})
+            return web.json_response(
+                {"message": "You are being rate limited.", "retry_after": reset_after, "global": False},
+                status=429, headers=headers
+            )
+        return headers
+
+    def cloudflare(self):
+        if time.monotonic() < self.cloudflare_until:
+            self.cloudflare_hits += 1
+            return web.Response(
+                status=429, text="<!DOCTYPE html><html><body>Access denied | Cloudflare</body></html>",
+                content_type="text/html"
+            )
+        return None
+
+    async def create_message(self, request):
+        blocked = self.cloudflare()
+        if blocked is not None:
+            return blocked
+        channel = int(request.match_info["channel"])
+        headers = self.limited(f"channel:{channel}", *CHANNEL_LIMIT)
+        if isinstance(headers, web.Response):
+            return headers
+        body = await request.json()
+        self.received.setdefault(channel, []).append(body.get("content"))
+        return web.json_response({"id": next(self.ids), "channel_id": channel}, headers=headers)
+
+    async def edit_message(self, request):
+        # Discord buckets edits per channel, whichever message they touch
+        channel = int(request.match_info["channel"])
+        message = int(request.match_info["message"])
+        headers = self.limited(f"edit:{channel}", *CHANNEL_LIMIT)
+        if isinstance(headers, web.Response):
+            return headers
+        body = await request.json()
+        self.edits.setdefault(message, []).append(body.get("content"))
+        return web.json_response({"id": message}, headers=headers)
+
+    async def interaction_callback(self, request):
+        headers = self.limited(f"interaction:{request.match_info['token']}", *CHANNEL_LIMIT)
+        if isinstance(headers, web.Response):
+            return headers
+        self.interactions.append(time.monotonic())
+        return web.Response(status=204, headers=headers)
+
+
+class Channel:
+    def __init__(self, id, session, base):
+        self.id = id
+        self.session = session
+        self.base = base
+
+    async def send(self, content=None, **kwargs):
+        async with self.session.post(
+            f"{self.base}/channels/{self.id}/messages", json={"content": content}
+        ) as resp:
+            data = await response_data(resp)
+            return Message(data["id"], self)
+
+
+class Message:
+    def __init__(self, id, channel):
+        self.id = id
+        self.channel = channel
+
+    async def edit(self, content=None, **kwargs):
+        channel = self.channel
+        async with channel.session.patch(
+            f"{channel.base}/channels/{channel.id}/messages/{self.id}", json={"content": content}
+        ) as resp:
+            await response_data(resp)
+            return self
+
+
+class Interaction:
+    def __init__(self, id, session, base):
+        self.id = id
+        self.token = f"token{id}"
+        self.session = session
+        self.base = base
+
+    async def reply(self, content=None):
+        async with self.session.post(
+            f"{self.base}/interactions/{self.id}/{self.token}/callback"
+        ) as resp:
+            return await response_data(resp)
+
+
+async def response_data(resp):
+    if resp.content_type == "application/json":
+        data = await resp.json()
+    else:
+        data = await resp.text()
+    if resp.status >= 400:
+        # What discord.py raises for a 429 it doesn't retry itself
+        raise HTTPException(resp, data)
+    return data
+
+
+async def legacy_safe_send(channel, **kwargs):
+    """safe_send before the scheduler."""
+    try:
+        return await channel.send(**kwargs)
+    except HTTPException as e:
+        text = getattr(e, "text", "") or ""
+        if e.status == 429 and "DOCTYPE html" in text:
+            return None
+        if e.status == 429:
+            retry_after = float(e.response.headers.get("Retry-After", 5))
+            await asyncio.sleep(retry_after)
+            try:
+                return await channel.send(**kwargs)
+            except Exception:
+                return None
+        raise
+
+
+async def start_mock():
+    mock = MockDiscord()
+    app = web.Application()
+    app.router.add_post("/channels/{channel}/messages", mock.create_message)
+    app.router.add_patch("/channels/{channel}/messages/{message}", mock.edit_message)
+    app.router.add_post("/interactions/{id}/{token}/callback", mock.interaction_callback)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return mock, runner, f"http://127.0.0.1:{port}"
+
+
+async def burst(send, channels):
+    t = time.perf_counter()
+    results = await asyncio.gather(*(
+        send(channel, content=f"{channel.id}:{i}")
+        for i in range(PER_CHANNEL) for channel in channels
+    ))
+    return time.perf_counter() - t, sum(r is None for r in results)
+
+
+async def scenario_burst():
+    rows = []
+    for label in ("old safe_send", "scheduler"):
+        mock, runner, base = await start_mock()
+        sched = SendScheduler()
+        async with aiohttp.ClientSession(trace_configs=[sched.trace_config()]) as session:
+            channels = [Channel(100 + i, session, base) for i in range(CHANNELS)]
+            send = legacy_safe_send if label == "old safe_send" else sched.send
+            wall, dropped = await burst(send, channels)
+        await runner.cleanup()
+        delivered = sum(len(v) for v in mock.received.values())
+        rows.append((label, wall, delivered, dropped, mock.too_many, sched.stats()))
+        if label == "scheduler":
+            assert dropped == 0 and delivered == CHANNELS * PER_CHANNEL, (dropped, delivered)
+            for channel, contents in mock.received.items():
+                assert contents == [f"{channel}:{i}" for i in range(PER_CHANNEL)], "out of order"
+            learned = sched.bucket(("channel", 100)).limit
+            assert learned == CHANNEL_LIMIT[0], learned
+    return rows
+
+
+async def scenario_priority():
+    mock, runner, base = await start_mock()
+    sched = SendScheduler()
+    async with aiohttp.ClientSession(trace_configs=[sched.trace_config()]) as session:
+        channel = Channel(200, session, base)
+        sends = [asyncio.ensure_future(sched.send(channel, content=f"200:{i}")) for i in range(12)]
+        await asyncio.sleep(0.05)
+        interaction = Interaction(1, session, base)
+        t = time.monotonic()
+        await sched.interaction(interaction, interaction.reply, content="pong")
+        reply_wait = time.monotonic() - t
+        await asyncio.gather(*sends)
+        last_send = time.monotonic() - t
+    await runner.cleanup()
+    assert reply_wait < 0.2 < last_send, (reply_wait, last_send)
+    learned = sched.bucket(("interaction", interaction.token)).limit
+    assert learned == CHANNEL_LIMIT[0], learned
+    return reply_wait, last_send
+
+
+async def scenario_edits():
+    mock, runner, base = await start_mock()
+    sched = SendScheduler()
+    async with aiohttp.ClientSession(trace_configs=[sched.trace_config()]) as session:
+        channel = Channel(300, session, base)
+        message = await sched.send(channel, content="page 0")
+        edits = [sched.edit(message, content=f"page {i}") for i in range(1, 21)]
+        await asyncio.gather(*edits)
+    await runner.cleanup()
+    seen = mock.edits[message.id]
+    assert seen[-1] == "page 20", seen
+    return len(edits), len(seen), sched.stats()["merged"]
+
+
+class PerMessageEdits(SendScheduler):
+    """The first scheduler: one guessed bucket per edited message."""
+
+    async def edit(self, message, **kwargs):
+        key = ("edit", message.id)
+        return await self.submit(2, key, message.edit, kwargs, merge_key=key)
+
+
+async def scenario_channel_edits():
+    rows = []
+    for label, cls in (("per message", PerMessageEdits), ("per channel", SendScheduler)):
+        mock, runner, base = await start_mock()
+        sched = cls()
+        async with aiohttp.ClientSession(trace_configs=[sched.trace_config()]) as session:
+            channel = Channel(500, session, base)
+            # Pages already sent by another sender, all edited at once
+            messages = [Message(i, channel) for i in range(1, 13)]
+            t = time.perf_counter()
+            results = await asyncio.gather(*(
+                sched.edit(m, content=f"edit {m.id}.{i}") for i in range(2) for m in messages
+            ))
+            wall = time.perf_counter() - t
+        await runner.cleanup()
+        applied = sum(len(v) for v in mock.edits.values())
+        rows.append((label, wall, applied, sum(r is None for r in results), mock.too_many))
+        if cls is SendScheduler:
+            assert mock.too_many == 0, mock.too_many
+            learned = sched.bucket(("edit", 500)).limit
+            assert learned == CHANNEL_LIMIT[0], learned
+    return rows
+
+
+async def scenario_cloudflare():
+    rows = []
+    for label in ("old safe_send", "scheduler"):
+        mock, runner, base = await start_mock()
+        mock.cloudflare_until = time.monotonic() + 0.5
+        sched = SendScheduler(cloudflare_backoff=0.6)
+        async with aiohttp.ClientSession(trace_configs=[sched.trace_config()]) as session:
+            channels = [Channel(400 + i, session, base) for i in range(3)]
+            send = legacy_safe_send if label == "old safe_send" else sched.send
+            results = await asyncio.gather(*(
+                send(channel, content=f"{channel.id}:{i}") for i in range(3) for channel in channels
+            ))
+        await runner.cleanup()
+        rows.append((label, mock.cloudflare_hits, sum(r is None for r in results)))
+    return rows
+
+
+def report():
+    _print = builtins.print
+    builtins.print = lambda *a, **k: None  # the scheduler logs every retry
+    try:
+        bursts = asyncio.run(scenario_burst())
+        reply_wait, last_send = asyncio.run(scenario_priority())
+        edits, applied, merged = asyncio.run(scenario_edits())
+        channel_edits = asyncio.run(scenario_channel_edits())
+        cloudflare = asyncio.run(scenario_cloudflare())
+    finally:
+        builtins.print = _print
+
+    print(f"Burst: {CHANNELS} channels x {PER_CHANNEL} messages, mock limit "
+          f"{CHANNEL_LIMIT[0]}/{CHANNEL_LIMIT[1]:.0f}s per channel")
+    print(f"{'sender':<14} {'wall s':>7} {'sent':>5} {'dropped':>8} {'429s':>5} {'depth':>6} {'p50 s':>6} {'p95 s':>6}")
+    for label, wall, delivered, dropped, too_many, st in bursts:
+        depth, p50, p95 = (st["max_depth"], st["wait_p50"], st["wait_p95"]) if label == "scheduler" else (0, 0, 0)
+        print(f"{label:<14} {wall:>7.2f} {delivered:>5} {dropped:>8} {too_many:>5} {depth:>6} {p50:>6.2f} {p95:>6.2f}")
+    print(f"Interaction reply behind 12 queued sends: {reply_wait * 1000:.0f} ms "
+          f"(last send {last_send:.2f} s)")
+    print(f"Edits: {edits} queued, {applied} reached the server, {merged} merged, last one kept")
+    print("Edits of 12 messages in one channel, twice each:")
+    for label, wall, applied, dropped, too_many in channel_edits:
+        print(f"  {label:<12} {wall:>5.2f} s  {applied} applied  {dropped} dropped  {too_many} 429s")
+    for label, hits, dropped in cloudflare:
+        print(f"Cloudflare block, {label:<14}: {hits} requests into the block, {dropped} dropped")
+
+
+if __name__ == "__main__":
+    report()
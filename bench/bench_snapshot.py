@@ -0,0 +1,61 @@
+"""
+Cold load of data/Olympus.xlsx: openpyxl vs the binary snapshot.
+
+Each path runs in a fresh interpreter so the numbers are real cold starts.
+Peak RSS is ru_maxrss of the child (KB on Linux), minus what importing
+pandas alone costs.
+
+    python bench/bench_snapshot.py [runs]
+"""
+import os, sys, json, shutil, subprocess, tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+XLSX = os.path.join(ROOT, "data", "Olympus.xlsx")
+
+CHILD = r"""
+import sys, time, json, resource
+sys.path.insert(0, {root!r})
+import pandas as pd
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+from snapshot import load_workbook
+t = time.perf_counter()
+df, source = load_workbook({xlsx!r}, cache_dir={cache!r})
+dt = time.perf_counter() - t
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"source": source, "seconds": dt, "rss_kb": peak - base, "rows": len(df)}}))
+"""
+
+
+def run_child(cache_dir):
+    code = CHILD.format(root=ROOT, xlsx=XLSX, cache=cache_dir)
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    results = {"excel": [], "snapshot": []}
+    for _ in range(runs):
+        cache_dir = tempfile.mkdtemp(prefix="olympus-snap-")
+        try:
+            cold = run_child(cache_dir)   # no snapshot yet -> openpyxl
+            warm = run_child(cache_dir)   # snapshot written by the run above
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        results[cold["source"]].append(cold)
+        results[warm["source"]].append(warm)
+
+    print(f"{'path':<10} {'runs':>4} {'best ms':>9} {'median ms':>10} {'peak RSS MB':>12}")
+    for source, rows in results.items():
+        if not rows:
+            continue
+        times = sorted(r["seconds"] * 1000 for r in rows)
+        rss = max(r["rss_kb"] for r in rows) / 1024
+        print(f"{source:<10} {len(rows):>4} {times[0]:>9.1f} {times[len(times) // 2]:>10.1f} {rss:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# coalesce.py
+import asyncio
+import sys
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+MISSING = object()
+
+
+class SingleFlight:
+    """
+    One computation per key at a time. The first request for a key starts
+    it; identical requests arriving before it finishes await the same
+    task instead of starting their own. Nothing is kept afterwards.
+
+    Keys are built by the caller and must carry everything that changes
+    the answer (command, resolved names, filters, range, snapshot version).
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.enabled = True
+        self.leaders = 0
+        self.followers = 0
+
+    def __len__(self):
+        return len(self.calls)
+
+    async def run(self, key, compute):
+        """await compute(), or the one already running for `key`."""
+        if not self.enabled:
+            return await compute()
+        task = self.calls.get(key)
+        if task is None:
+            self.leaders += 1
+            task = self.calls[key] = asyncio.ensure_future(compute())
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.followers += 1
+        # shield: one caller giving up doesn't cancel it for the others
+        return await asyncio.shield(task)
+
+    def _done(self, key, task):
+        if self.calls.get(key) is task:
+            del self.calls[key]
+
+    def stats(self):
+        total = self.leaders + self.followers
+        return {
+            "in_flight": len(self.calls),
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "shared_rate": self.followers / total if total else 0.0
+        }
+
+
+def _column_nbytes(column):
+    # Categories are shared with the snapshot's frame: only the codes are ours
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.cat.codes.nbytes
+    return int(column.memory_usage(deep=True, index=False))
+
+
+def result_nbytes(value):
+    """
+    Rough memory held by a query result, counting string contents.
+    Categorical columns count their codes only, not the categories they
+    share with the snapshot.
+    """
+    if isinstance(value, pd.Series):
+        return _column_nbytes(value) + int(value.index.memory_usage(deep=True))
+    if isinstance(value, pd.DataFrame):
+        return sum(_column_nbytes(value[c]) for c in value.columns) + \
+            int(value.index.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(result_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """
+    LRU of finished query results, bounded by bytes instead of entries,
+    with a TTL so quiet entries don't sit around until pushed out.
+
+    Keys start with the snapshot version, so a reload never serves old
+    results; prune() drops the old version's entries straight away.
+    A single result over a quarter of the budget is not kept at all.
+    """
+
+    def __init__(self, maxbytes=64 * 1024 * 1024, ttl=600, clock=time.monotonic):
+        self.maxbytes = maxbytes
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()  # key -> (value, nbytes, expires)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.rejected = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        """Cached value for `key`, or MISSING."""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+        value, nbytes, expires = entry
+        if expires <= self.clock():
+            self._drop(key)
+            self.expired += 1
+            self.misses += 1
+            return MISSING
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value, nbytes=None):
+        if nbytes is None:
+            nbytes = result_nbytes(value)
+        if nbytes > self.maxbytes // 4 or self.maxbytes <= 0:
+            self.rejected += 1
+            return
+        if key in self.entries:
+            self._drop(key)
+        self.entries[key] = (value, nbytes, self.clock() + self.ttl)
+        self.bytes += nbytes
+        while self.bytes > self.maxbytes:
+            oldest = next(iter(self.entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def prune(self, version):
+        """Drop every entry whose key isn't for snapshot `version`."""
+        for key in [k for k in self.entries if k[0] != version]:
+            self._drop(key)
+            self.evictions += 1
+
+    def _drop(self, key):
+        _, nbytes, _ = self.entries.pop(key)
+        self.bytes -= nbytes
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "bytes": self.bytes,
+            "maxbytes": self.maxbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "rejected": self.rejected
+        }
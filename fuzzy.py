@@ -0,0 +1,132 @@
+# fuzzy.py
+import heapq
+from collections import Counter, OrderedDict
+from difflib import SequenceMatcher
+import numpy as np
+
+
+class MatchCache:
+    """
+    Bounded LRU of query -> [(ratio, word), ...]. Keys carry the snapshot
+    version, so a reload never serves old names; old entries just age out.
+    """
+
+    def __init__(self, maxsize=2048):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, compute):
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            value = self.entries[key] = compute()
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+            return value
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def stats(self):
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return {
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": rate
+        }
+
+
+# Shared by every snapshot's indexes
+MATCH_CACHE = MatchCache()
+
+
+class FuzzyIndex:
+    """
+    Same results as difflib.get_close_matches(word, words, n, cutoff),
+    without running SequenceMatcher over every word.
+
+    Words are indexed by character: char -> (word ids, count of that char).
+    For a query, the postings give each word's shared-character count,
+    which is exactly difflib's quick_ratio() upper bound. Only words whose
+    length bound (real_quick_ratio) and quick_ratio pass the cutoff get a
+    real ratio(). Bigram/trigram postings would be smaller, but a word can
+    reach ratio 0.5 without sharing any n-gram with the query, so they
+    could drop matches difflib returns.
+    """
+
+    def __init__(self, words, cache=None, cache_key=None):
+        # cache_key names this index in `cache`, e.g. (version, "Name")
+        self.cache = cache
+        self.cache_key = cache_key
+        self.words = list(dict.fromkeys(words))
+        self.lengths = np.array([len(w) for w in self.words], dtype=np.int64)
+        postings = {}
+        for i, w in enumerate(self.words):
+            for ch, count in Counter(w).items():
+                ids, counts = postings.setdefault(ch, ([], []))
+                ids.append(i)
+                counts.append(count)
+        self.postings = {
+            ch: (np.array(ids, dtype=np.int64), np.array(counts, dtype=np.int64))
+            for ch, (ids, counts) in postings.items()
+        }
+
+    def __len__(self):
+        return len(self.words)
+
+    def candidates(self, word, cutoff):
+        """Word ids that can still reach `cutoff` (difflib's cheap bounds)."""
+        if not self.words:
+            return np.empty(0, dtype=np.int64)
+        shared = np.zeros(len(self.words), dtype=np.int64)
+        for ch, qcount in Counter(word).items():
+            posting = self.postings.get(ch)
+            if posting is None:
+                continue
+            ids, counts = posting
+            shared[ids] += np.minimum(counts, qcount)
+        total = self.lengths + len(word)
+        # Same float formula as difflib's _calculate_ratio
+        with np.errstate(divide="ignore", invalid="ignore"):
+            shortest = np.minimum(self.lengths, len(word))
+            real_quick = np.where(total > 0, 2.0 * shortest / total, 1.0)
+            quick = np.where(total > 0, 2.0 * shared / total, 1.0)
+        return np.flatnonzero((real_quick >= cutoff) & (quick >= cutoff))
+
+    def scored_matches(self, word, n=3, cutoff=0.6):
+        """[(ratio, word), ...] best first, as get_close_matches ranks them."""
+        if not n > 0:
+            raise ValueError("n must be > 0: %r" % (n,))
+        if not 0.0 <= cutoff <= 1.0:
+            raise ValueError("cutoff must be in [0.0, 1.0]: %r" % (cutoff,))
+        if self.cache is None:
+            return self._scored_matches(word, n, cutoff)
+        key = (self.cache_key, word, n, cutoff)
+        # Copy so callers can't edit the cached list
+        return list(self.cache.get(
+            key, lambda: self._scored_matches(word, n, cutoff)
+        ))
+
+    def _scored_matches(self, word, n, cutoff):
+        result = []
+        s = SequenceMatcher()
+        s.set_seq2(word)
+        for i in self.candidates(word, cutoff):
+            x = self.words[i]
+            s.set_seq1(x)
+            # quick bounds were checked in bulk above
+            if s.ratio() >= cutoff:
+                result.append((s.ratio(), x))
+        return heapq.nlargest(n, result)
+
+    def close_matches(self, word, n=3, cutoff=0.6):
+        return [x for _, x in self.scored_matches(word, n, cutoff)]
@@ -1,22 +1,32 @@
 import discord
 import pandas as pd
-from wcwidth import wcswidth
-import os, time, json, random, re
+import os, time, json, random
 from keep_alive import keep_alive
 from discord import Embed
 from discord import ui, Interaction
 from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import asyncio
+import numpy as np
 from discord.errors import HTTPException
-import re
 from difflib import get_close_matches
 from datetime import datetime, time as dt_time
 import copy
+from snapshot import (
+    build_snapshot, is_stale, player_totals, combine_masks, NO_ROWS
+)
+from fuzzy import MATCH_CACHE
+from render import frame_table
+from router import Router, parse_date_filter, PREFIX, X_PREFIX
+from coalesce import SingleFlight, ResultCache, result_nbytes, MISSING
+from outbound import SendScheduler
 
 COLUMNS_DEFAULT = ["Ņ", "Score", "Name", "Tank", "Id"]
 COLUMNS_C = ["Ņ", "Tank", "Name", "Score", "Id"]
+# Every !o; and x! command registers here, see process_olympus_command
+ROUTER = Router()
 
-FIRST_COLUMN = "Score"
 COOLDOWN_SECONDS = 7
 user_cooldowns = {}
 CU_ACTIVE = set()
@@ -24,34 +34,39 @@ CU_ACTIVE = set()
 intents = discord.Intents.default()
 intents.message_content = True
 
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+# Every message, edit and interaction reply is queued here, see outbound.py
+SENDS = SendScheduler()
+
+bot = commands.Bot(
+    command_prefix="!",
+    intents=intents,
+    # Rate-limit headers of every response feed SENDS' buckets
+    http_trace=SENDS.trace_config()
+)
 
-DATAFRAME_CACHE = None
-CACHE_TTL = 300  # 5 minutes
+DATA_PATH = "data/Olympus.xlsx"
+CURRENT_SNAPSHOT = None
+SNAPSHOT_VERSION = 0
+RELOAD_CHECK_SECONDS = 30
+RELOAD_LOCK = asyncio.Lock()
 
 async def safe_send(channel, **kwargs):
-    try:
-        return await channel.send(**kwargs)
-    except HTTPException as e:
-        # Check if this is a Cloudflare block (HTML 429)
-        text = getattr(e, "text", "") or ""
-        if e.status == 429 and "DOCTYPE html" in text:
-            print("Blocked by Cloudflare, cannot send message.")
-            return None  # Don't crash; just skip
-        # Normal Discord 429 handling
-        if e.status == 429:
-            retry_after = getattr(e, "retry_after", 5)
-            print(f"Rate limited — sleeping {retry_after}s")
-            await asyncio.sleep(retry_after)
-            try:
-                return await channel.send(**kwargs)
-            except Exception as inner_e:
-                print("Retry failed:", inner_e)
-                return None
-        raise  # re-raise any other exception
+    # Queued behind the channel's rate limit; 429s are retried there.
+    # None when it still couldn't go out (rate limited too long, Cloudflare)
+    return await SENDS.send(channel, **kwargs)
+
+
+async def safe_edit(message, **kwargs):
+    # A newer edit of the same message, queued meanwhile, replaces this one
+    return await SENDS.edit(message, **kwargs)
+
+
+async def safe_reply(interaction, call, **kwargs):
+    # call is one of interaction's reply methods; these go out first
+    return await SENDS.interaction(interaction, call, **kwargs)
 
 
 
@@ -121,7 +136,6 @@ class DidYouMeanView(ui.View):
         cmd,
         message_source,
         channel,
-        df,
         parts,
         index,
         resolver,
@@ -132,7 +146,6 @@ class DidYouMeanView(ui.View):
         self.cmd = cmd
         self.message_source = message_source
         self.channel = channel
-        self.df = df
         self.parts = parts
         self.index = index
         self.resolver = resolver
@@ -144,7 +157,7 @@ class DidYouMeanView(ui.View):
             item.disabled = True
         if self.message:
             try:
-                await self.message.edit(view=self)
+                await safe_edit(self.message, view=self)
             except Exception as e:
                 print(
                     "DidYouMeanView timeout edit failed:",
@@ -172,7 +185,7 @@ def apply_footer(embed, start, end, total, warning=None):
 
 
 
-async def handle_collective_score(message, df, parts):
+async def handle_collective_score(message, snap, parts, mask=None, key=None):
     if len(parts) < 3:
         await safe_send(
             message.channel,
@@ -192,39 +205,25 @@ async def handle_collective_score(message, df, parts):
         )
         name_input = parts[2].strip()
         # Player name lookup
-        names = {
-            str(name).lower(): str(name)
-            for name in df["Name"].dropna().unique()
-        }
-        name_key = name_input.lower()
-        if name_key not in names:
-            matches = get_close_matches(
-                name_key,
-                names.keys(),
-                n=1,
-                cutoff=0.65
-            )
-
-            if not matches:
-                if cooking_msg:
-                    await cooking_msg.edit(
-                        content=f"`{name_input}` not found."
-                    )
-                return
-            name = names[matches[0]]
-        else:
-            name = names[name_key]
+        name = snap.vocab.closest("Name", name_input, mask, cutoff=0.65)
+        if name is None:
+            if cooking_msg:
+                await safe_edit(
+                    cooking_msg,
+                    content=f"`{name_input}` not found."
+                )
+            return
         # Get every score by player
-        player_df = df[
-            df["Name"].astype(str).str.lower() == name.lower()
-        ].copy()
+        player_df = await compute_once(
+            key and key + (name,), handle_name, snap, name, mask
+        )
         if player_df.empty:
             if cooking_msg:
-                await cooking_msg.edit(
+                await safe_edit(
+                    cooking_msg,
                     content=f"No scores found for **{name}**."
                 )
             return
-        player_df = normalize_score(player_df)
         # Sum ALL scores
         total_score = player_df["Score"].sum()
         # Random tank they played
@@ -246,12 +245,13 @@ async def handle_collective_score(message, df, parts):
             f"and the most integral tank to that was **{random_tank}**."
         )
         if cooking_msg:
-            await cooking_msg.edit(content=result)
+            await safe_edit(cooking_msg, content=result)
     except Exception as e:
         print("[CU ERROR]", e)
         if cooking_msg:
             try:
-                await cooking_msg.edit(
+                await safe_edit(
+                    cooking_msg,
                     content="Failed cooking that up."
                 )
             except:
@@ -286,7 +286,8 @@ class DidYouMeanButton(ui.Button):
             f"[FUZZY] {view.cmd} -> {corrected_command}"
         )
         # Remove old "Did you mean?" message
-        await interaction.edit_original_response(
+        await safe_reply(
+            interaction, interaction.edit_original_response,
             content=f" Cooking...",
             embed=None,
             view=None
@@ -304,13 +305,9 @@ class DidYouMeanButton(ui.Button):
 
 
 
-def handle_random_analysis(df, mode):
-    df = normalize_score(df)
-    best = (
-        df.sort_values("Score", ascending=False)
-          .drop_duplicates("Tank")
-    )
-    used = set(best["Tank"].str.lower())
+def handle_random_analysis(snap, mode, mask=None):
+    best = snap.rows(snap.best_rows("Tank", mask))
+    used = set(best["tank_key"])
     unused = [t for t in TANK_NAMES if t.lower() not in used]
     if mode == 0:
         rows = [{
@@ -340,37 +337,34 @@ def handle_random_analysis(df, mode):
 
 
 
-def handle_name_extended(df, name):
+def handle_name_extended(snap, name, mask=None):
     """
     Same as !o;n;<Player>, but adds:
       LB       = global leaderboard rank for the score
       Tank LB  = leaderboard rank within that tank
     """
-    df = normalize_score(df).copy()
-    # Sort every score globally, highest first
-    df = df.sort_values("Score", ascending=False).reset_index(drop=True)
-    # Overall leaderboard rank
-    df["LB"] = range(1, len(df) + 1)
-    # Rank within each tank
-    df["Tank LB"] = (
-        df.groupby("Tank")["Score"]
-          .rank(method="min", ascending=False)
-          .astype(int)
-    )
-    # Only this player's scores
-    player_df = df[
-        df["Name"].astype(str).str.lower() == name.lower()
-    ].copy()
-    # Keep the player's scores ordered by global score
-    player_df = player_df.sort_values("Score", ascending=False)
-    return player_df
+    # LB / Tank LB are snapshot columns, only gather this player's rows
+    if mask is None:
+        return handle_name(snap, name)
+    # Date-filtered: rank within the filtered rows instead
+    df = snap.rows(snap.score_order, mask)
+    df = df.assign(**{
+        "LB": range(1, len(df) + 1),
+        "Tank LB": (
+            df.groupby("Tank", observed=True)["Score"]
+              .rank(method="min", ascending=False)
+              .astype(int)
+        )
+    })
+    # Only this player's scores, already ordered by global score
+    return df[df["name_key"] == name.lower()]
 
 
 
 
 
 
-def handle_nu_range(df):
+def handle_nu_range(snap, start_nu, end_nu, mask=None):
     """
     Uses the 'nu' column as the filter source.
     Example:
@@ -380,37 +374,40 @@ def handle_nu_range(df):
     Output columns:
     Tank, Name, Score, Id, nu
     """
-    if "nu" not in df.columns:
+    if "nu" not in snap.frame.columns:
         return pd.DataFrame()
-    df = normalize_score(df).copy()
-    # make nu numeric
-    df["nu"] = pd.to_numeric(df["nu"], errors="coerce")
-    # remove invalid nu rows
-    df = df.dropna(subset=["nu"])
-    # sort by nu ascending
-    df = df.sort_values("nu", ascending=True).reset_index(drop=True)
-    return df
+    # binary search on the snapshot's sorted nu values
+    return snap.rows(snap.nu_range(start_nu, end_nu), mask)
 
 
 
 
 # --- Helper for !o;nt ---
-async def handle_name_tank(message, df, parts):
+async def handle_name_tank(message, snap, parts, mask=None, key=None):
     if len(parts) < 4:
         await safe_send(message.channel, content="❌ Usage: !o;nt;<Name>;<Tank>")
         return
     input1, input2 = parts[2].strip(), parts[3].strip()
-    name_choices = df["Name"].dropna().unique()
-    tank_choices = df["Tank"].dropna().unique()
-    # Detect which is name / tank
-    name = input1 if any(input1.lower() == n.lower() for n in name_choices) else input2
+    # Detect which is name / tank, among the players in the filtered rows
+    names = snap.vocab.table("Name", mask)
+    ambiguous = snap.vocab.ambiguous
+    first_is_name = input1.lower() in names
+    if (
+        first_is_name and input1.lower() in ambiguous
+        and input2.lower() in names and input2.lower() not in ambiguous
+    ):
+        # First is both a player and a tank, second only a player
+        first_is_name = False
+    name = input1 if first_is_name else input2
     tank = input2 if name == input1 else input1
     # Fuzzy name
     name = await fuzzy_or_abort(
         message=message,
-        df=df,
+        snap=snap,
+        column="Name",
+        mask=mask,
         user_input=name,
-        choices=name_choices,
+        parts=parts,
         arg_index=2,
         resolver=handle_name,
         title="Player not found — did you mean?",
@@ -422,9 +419,11 @@ async def handle_name_tank(message, df, parts):
     # Fuzzy tank
     tank = await fuzzy_or_abort(
         message=message,
-        df=df,
+        snap=snap,
+        column="Tank",
+        mask=mask,
         user_input=tank,
-        choices=tank_choices,
+        parts=parts,
         arg_index=3,
         resolver=handle_tank,
         title="Tank not found — did you mean?",
@@ -433,19 +432,21 @@ async def handle_name_tank(message, df, parts):
     )
     if tank is None:
         return
-    # Filter results
-    df_filtered = df[
-        (df["Name"].str.lower() == name.lower()) &
-        (df["Tank"].str.lower() == tank.lower())
-    ].copy()
+    # Filter results, already sorted by Score
+    if key is not None:
+        key += (name, tank)
+    df_filtered = await compute_once(
+        key,
+        snap.rows,
+        snap.player_tank_rows.get((name.lower(), tank.lower()), NO_ROWS),
+        mask
+    )
     if df_filtered.empty:
         await safe_send(
             message.channel,
             content=f"❌ No scores for **{name}** with **{tank}**."
         )
         return
-    df_filtered = normalize_score(df_filtered)
-    df_filtered = df_filtered.sort_values("Score", ascending=False)
     df_filtered = add_index(df_filtered)
     cols = ["Ņ", "Score", "Date", "Id"]
     df_filtered = df_filtered[cols]
@@ -461,11 +462,14 @@ async def handle_name_tank(message, df, parts):
         start_index=start,
         range_size=range_size,
         title=f"Scores for {name} with {tank}",
-        shorten_tank=True
+        shorten_tank=True,
+        snap=snap
     )
-    slice_df = df_filtered.iloc[start-1:end].copy()
+    slice_df = df_filtered.iloc[start-1:end]
     slice_df["Ņ"] = range(start, min(end, len(df_filtered)) + 1)
-    lines = dataframe_to_markdown_aligned(slice_df)
+    lines = await compute_once(
+        key and key + (start, end), dataframe_to_markdown_aligned, slice_df, snap=snap
+    )
     title = f"Scores for {name} with {tank}"
     embed = make_embed(title, lines)
     footer = f"Rows {start}-{min(end, len(df_filtered))} / {len(df_filtered)}"
@@ -480,53 +484,149 @@ async def handle_name_tank(message, df, parts):
 
 
 
-def read_excel_cached():
-    global DATAFRAME_CACHE
+# ---------------- compute pool ----------------
+# Queries and table renders run here so the event loop only awaits them
+# and keeps up with heartbeats and other guilds. Threads, not processes:
+# every worker reads the same in-memory snapshot. One by default: the
+# render work is mostly pure Python, so extra threads only fight the
+# loop for the GIL (see bench/bench_loop.py). 0 runs work inline.
+COMPUTE_WORKERS = int(os.getenv("COMPUTE_WORKERS", "1"))
+COMPUTE_POOL = (
+    ThreadPoolExecutor(COMPUTE_WORKERS, thread_name_prefix="compute")
+    if COMPUTE_WORKERS > 0 else None
+)
+
+
+async def run_compute(fn, *args, **kwargs):
+    """fn(*args, **kwargs) on the compute pool, awaited from the loop."""
+    if COMPUTE_POOL is None:
+        return fn(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        COMPUTE_POOL, functools.partial(fn, *args, **kwargs)
+    )
+
+
+# Identical queries in flight share one computation, and finished ones
+# are kept for a while (bytes-bounded LRU + TTL), see coalesce.py
+FLIGHTS = SingleFlight()
+RESULTS = ResultCache(
+    maxbytes=int(os.getenv("RESULT_CACHE_MB", "64")) * 1024 * 1024,
+    ttl=int(os.getenv("RESULT_CACHE_TTL", "600"))
+)
+
+
+def query_key(snap, command, *args):
+    """
+    What makes two requests the same query: snapshot version, command,
+    date/GT filters, plus what the handler resolved (names, range...).
+    """
+    return (snap.version, command.prefix, command.name, command.date, command.gt) + args
+
+
+def _sized(fn, *args, **kwargs):
+    value = fn(*args, **kwargs)
+    return value, result_nbytes(value)
+
+
+async def compute_once(key, fn, *args, **kwargs):
+    """
+    run_compute() for a keyed query: from RESULTS if it ran recently,
+    else shared with identical requests while it runs. No key: neither.
+    Results are shared between callers, so never modify them in place.
+    """
+    if key is None:
+        return await run_compute(fn, *args, **kwargs)
+    value = RESULTS.get(key)
+    if value is not MISSING:
+        return value
+
+    async def compute():
+        # Sized on the worker too, deep memory_usage walks the strings
+        value, nbytes = await run_compute(_sized, fn, *args, **kwargs)
+        RESULTS.put(key, value, nbytes)
+        return value
+
+    return await FLIGHTS.run(key, compute)
 
-    if DATAFRAME_CACHE is not None:
-        return DATAFRAME_CACHE.copy()
 
+def load_snapshot(version):
+    """Build a snapshot and its warm first pages (off-loop on reloads)."""
+    snap = build_snapshot(DATA_PATH, version, branches=load_branches())
     try:
-        DATAFRAME_CACHE = pd.read_excel("data/Olympus.xlsx")
-        print("Excel loaded locally")
-        return DATAFRAME_CACHE.copy()
+        snap.warm_pages = render_warm_pages(snap)
     except Exception as e:
-        print("Excel load failed:", e)
-        return "fetch_error"
+        print("Warm pages failed:", e)
+        snap.warm_pages = {}
+    return snap
 
 
+async def get_snapshot():
+    """
+    The current snapshot. Before the first load has finished (or after
+    it failed) this waits for reload_snapshot() instead of building on
+    the event loop. None if there is still no data.
+    """
+    # Grab the reference once; a reload swapping it mid-command is harmless
+    snap = CURRENT_SNAPSHOT
+    if snap is not None:
+        return snap
+    return await reload_snapshot(if_missing=True)
 
 
-def extract_gt(parts, valid=None):
+async def reload_snapshot(if_missing=False):
     """
-    Extract GT filter letter (A, R, F, etc.)
-    Returns (gt_letter or None)
+    Build a new snapshot off the event loop and swap it in.
+    Returns the new snapshot, or None if the build failed.
+    if_missing: only load when there is no snapshot yet, e.g. a command
+    arriving while on_ready's first load holds the lock.
     """
-    if valid is None:
-        valid = {"a", "r", "f", "l"}
+    global CURRENT_SNAPSHOT, SNAPSHOT_VERSION
+    async with RELOAD_LOCK:
+        if if_missing and CURRENT_SNAPSHOT is not None:
+            return CURRENT_SNAPSHOT
+        t = time.perf_counter()
+        try:
+            snap = await asyncio.to_thread(
+                load_snapshot,
+                SNAPSHOT_VERSION + 1
+            )
+        except Exception as e:
+            print("Reload failed:", e)
+            return None
+        SNAPSHOT_VERSION = snap.version
+        # Single reference assignment = atomic swap for every reader
+        CURRENT_SNAPSHOT = snap
+        RESULTS.prune(snap.version)
+        snap.build_seconds = time.perf_counter() - t
+        print(
+            f"Snapshot v{snap.version} loaded ({snap.source}) "
+            f"in {snap.build_seconds:.2f}s"
+        )
+        return snap
+
+
+@tasks.loop(seconds=RELOAD_CHECK_SECONDS)
+async def watch_data_file():
+    if is_stale(CURRENT_SNAPSHOT, DATA_PATH):
+        print("Olympus.xlsx changed, reloading")
+        await reload_snapshot()
 
-    for p in parts:
-        p = p.strip().lower()
-        if len(p) == 1 and p in valid:
-            return p.upper()
-    return None
 
 
 
-async def send_screenshot(channel, df, screenshot_id):
+async def send_screenshot(channel, snap, screenshot_id):
     # Ensure Id column exists
-    if "Id" not in df.columns:
+    if "Id" not in snap.frame.columns:
         await safe_send(channel, content="❌ No Id column in data.")
         return
 
-    # Match Id as string
-    row = df[df["Id"].astype(str) == str(screenshot_id)]
-    if row.empty:
+    # Id index lookup, keys are strings
+    row = snap.records.get(str(screenshot_id))
+    if row is None:
         await safe_send(channel, content="❌ No screenshot with that Id.")
         return
 
-    row = row.iloc[0]
-
     cdn_url = safe_val(row, "CDN", None)
     if not cdn_url or not isinstance(cdn_url, str):
         await safe_send(channel, content="❌ No screenshot available for this entry.")
@@ -570,10 +670,38 @@ def handle_branch(df, branch_key):
 
 
 
+def branch_board(snap, branch_tanks):
+    """(table frame, rendered lines) for the best score of each branch tank."""
+    # Build rows: top score per tank (first row of the tank index)
+    rows = []
+    for tank in branch_tanks:
+        tank_rows = snap.tank_rows.get(tank.lower())
+        if tank_rows is None:
+            rows.append({"Tank": tank, "Score": 0, "Name": "", "Id": ""})
+        else:
+            best = snap.frame.iloc[tank_rows[0]]
+            rows.append({
+                "Tank": tank,
+                "Score": int(best["Score"]),
+                "Name": best.get("Name", ""),
+                "Id": best.get("Id", "")
+            })
+
+    # Sort + limit
+    rows.sort(key=lambda x: x["Score"], reverse=True)
+    rows = rows[:16]
+
+    display_df = pd.DataFrame(rows)
+    display_df["Ņ"] = range(1, len(display_df) + 1)
+    display_df = display_df[["Ņ", "Tank", "Name", "Score", "Id"]]
+    return display_df, dataframe_to_markdown_aligned(display_df)
+
+
 async def handle_branch_command(
     message,
     branch_name: str,
-    interaction: Interaction | None = None
+    interaction: Interaction | None = None,
+    parts=None
 ):
     # Load branches
     branches = load_branches()
@@ -581,7 +709,24 @@ async def handle_branch_command(
         content = "❌ Branch list unavailable."
 
         if interaction:
-            await interaction.edit_original_response(
+            await safe_reply(
+                interaction, interaction.edit_original_response,
+                content=content,
+                embed=None,
+                view=None
+            )
+        else:
+            await safe_send(message.channel, content=content)
+        return
+
+    # Load Excel (its vocabulary holds the branch names too)
+    snap = await get_snapshot()
+    if snap is None or snap.frame.empty:
+        content = "❌ Data unavailable."
+
+        if interaction:
+            await safe_reply(
+                interaction, interaction.edit_original_response,
                 content=content,
                 embed=None,
                 view=None
@@ -594,9 +739,10 @@ async def handle_branch_command(
     branch_key = await fuzzy_or_abort(
         message=message,
         interaction=interaction,
-        df=None,  # branches are not dataframe-based
+        snap=snap,
+        column="Branch",
         user_input=branch_name,
-        choices=branches.keys(),
+        parts=parts,
         arg_index=2,
         resolver=handle_branch,
         title="Branch not found — did you mean?",
@@ -613,22 +759,8 @@ async def handle_branch_command(
         content = "❌ Branch has no tanks defined."
 
         if interaction:
-            await interaction.edit_original_response(
-                content=content,
-                embed=None,
-                view=None
-            )
-        else:
-            await safe_send(message.channel, content=content)
-        return
-
-    # Load Excel
-    df = read_excel_cached()
-    if isinstance(df, str) or df.empty:
-        content = "❌ Data unavailable."
-
-        if interaction:
-            await interaction.edit_original_response(
+            await safe_reply(
+                interaction, interaction.edit_original_response,
                 content=content,
                 embed=None,
                 view=None
@@ -637,33 +769,11 @@ async def handle_branch_command(
             await safe_send(message.channel, content=content)
         return
 
-    df.columns = df.columns.str.strip()
-    df = normalize_score(df)
-
-    # Build rows: top score per tank
-    rows = []
-    for tank in branch_tanks:
-        tank_rows = df[df["Tank"].str.lower() == tank.lower()]
-        if tank_rows.empty:
-            rows.append({"Tank": tank, "Score": 0, "Name": "", "Id": ""})
-        else:
-            best = tank_rows.sort_values("Score", ascending=False).iloc[0]
-            rows.append({
-                "Tank": tank,
-                "Score": int(best["Score"]),
-                "Name": best.get("Name", ""),
-                "Id": best.get("Id", "")
-            })
-
-    # Sort + limit
-    rows.sort(key=lambda x: x["Score"], reverse=True)
-    rows = rows[:16]
-
-    display_df = pd.DataFrame(rows)
-    display_df["Ņ"] = range(1, len(display_df) + 1)
-    display_df = display_df[["Ņ", "Tank", "Name", "Score", "Id"]]
-
-    lines = dataframe_to_markdown_aligned(display_df)
+    # Same board for !o;bch and /branch until the data or branch list changes
+    key = (snap.version, "branch", branch_key, tuple(branch_tanks))
+    display_df, lines = await compute_once(
+        key, branch_board, snap, branch_tanks
+    )
 
     title = f"{branch_key} Branch"
     embed = make_embed(title, lines)
@@ -671,7 +781,8 @@ async def handle_branch_command(
 
     # FINAL SEND / EDIT
     if interaction:
-        await interaction.edit_original_response(
+        await safe_reply(
+            interaction, interaction.edit_original_response,
             embed=embed,
             view=None
         )
@@ -682,86 +793,121 @@ async def handle_branch_command(
 
 
 
-async def handle_cumulative_top10(message, df):
+def cumulative_top10_lines(totals):
+    # Top 15 cumulative scores
+    output = totals.head(15)
+    output["Ņ"] = range(1, len(output) + 1)
+    output = output[
+        ["Ņ", "Name", "Score", "Fave"]
+    ]
+    # Shorten favourite tank for table
+    output["Fave"] = (
+        output["Fave"]
+        .astype(str)
+        .str[:12]
+    )
+    return dataframe_to_markdown_aligned(
+        output,
+        shorten_tank=False
+    )
+
+
+# ---------------- warm pages ----------------
+# Default first page of the busiest boards, rendered once per snapshot.
+# cmd -> (title, columns, row positions in display order)
+WARM_BOARDS = {
+    "p": ("Leaderboard", COLUMNS_DEFAULT, lambda snap: snap.ordered()),
+    "b": ("Best Players", COLUMNS_DEFAULT, lambda snap: snap.best_rows("Name")),
+    "c": ("Best Per Tank", COLUMNS_C, lambda snap: snap.best_rows("Tank")),
+}
+WARM_STATS = {"hits": 0, "live": 0}
+
+
+def render_warm_pages(snap):
+    pages = {}
+    for cmd, (title, columns, board) in WARM_BOARDS.items():
+        positions = board(snap)
+        columns = [c for c in columns if c in snap.frame.columns]
+        if not len(positions):
+            continue
+        end = min(15, len(positions))
+        page = snap.frame.iloc[positions[:end]][columns]
+        page["Ņ"] = range(1, end + 1)
+        pages[cmd] = {
+            "title": title,
+            "lines": dataframe_to_markdown_aligned(page, True, snap),
+            "footer": f"Rows 1-{end} / {len(positions)}",
+            "positions": positions.astype(np.int32),
+            "columns": columns,
+            "range_size": end
+        }
+    if "Name" in snap.totals.columns and len(snap.totals):
+        pages["cu15"] = {
+            "title": "Top 15 Cumulative Scores",
+            "lines": cumulative_top10_lines(snap.totals),
+            "footer": "All scores combined and most played tank"
+        }
+    return pages
+
+
+def warm_page(snap, cmd):
+    """The pre-rendered page for `cmd`, counting the hit; None if absent."""
+    page = getattr(snap, "warm_pages", {}).get(cmd)
+    if page is not None:
+        WARM_STATS["hits"] += 1
+    return page
+
+
+def warm_page_message(snap, page):
+    """(embed, view) for a warm page; the view pages on from positions."""
+    embed = make_embed(page["title"], page["lines"])
+    embed.set_footer(text=page["footer"])
+    view = None
+    if "positions" in page:
+        view = RangePaginationView(
+            df=None,
+            start_index=1,
+            range_size=page["range_size"],
+            title=page["title"],
+            shorten_tank=True,
+            snap=snap,
+            positions=page["positions"],
+            columns=page["columns"]
+        )
+    return embed, view
+
+
+async def handle_cumulative_top10(message, snap, mask=None):
     cooking_msg = await safe_send(
         message.channel,
         content="Cooking up"
     )
 
     try:
-        df = normalize_score(df).copy()
-        # Remove invalid names
-        df = df.dropna(subset=["Name"])
-        df["Name"] = df["Name"].astype(str)
-
-        # ---------------- TOTAL SCORES ----------------
+        # Totals + favourite tank, prebuilt unless date-filtered
         totals = (
-            df.groupby("Name", as_index=False)["Score"]
-              .sum()
-        )
-        # ---------------- FAVOURITE TANK ----------------
-        # Tank used the most = most score entries with that tank
-        fave_counts = (
-            df.dropna(subset=["Tank"])
-              .groupby(["Name", "Tank"])
-              .size()
-              .reset_index(name="Uses")
-        )
-        fave_counts = (
-            fave_counts
-            .sort_values(
-                ["Name", "Uses"],
-                ascending=[True, False]
-            )
-            .drop_duplicates("Name")
-        )
-        # ---------------- MERGE ----------------
-        output = totals.merge(
-            fave_counts[["Name", "Tank"]],
-            on="Name",
-            how="left"
-        )
-        output = output.rename(
-            columns={"Tank": "Fave"}
-        )
-        output["Fave"] = output["Fave"].fillna("?")
-        # Top 15 cumulative scores
-        output = (
-            output
-            .sort_values("Score", ascending=False)
-            .head(15)
-            .reset_index(drop=True)
-        )
-        output["Ņ"] = range(1, len(output) + 1)
-        output = output[
-            ["Ņ", "Name", "Score", "Fave"]
-        ]
-        # Shorten favourite tank for table
-        output["Fave"] = (
-            output["Fave"]
-            .astype(str)
-            .str[:12]
-        )
-        lines = dataframe_to_markdown_aligned(
-            output,
-            shorten_tank=False
+            snap.totals
+            if mask is None
+            else await run_compute(lambda: player_totals(snap.frame[mask]))
         )
         embed = make_embed(
             "Top 15 Cumulative Scores",
-            lines
+            await run_compute(cumulative_top10_lines, totals)
         )
         embed.set_footer(
             text="All scores combined and most played tank"
         )
         if cooking_msg:
-            await cooking_msg.edit(
+            await safe_edit(
+                cooking_msg,
                 content=None,
                 embed=embed
             )
     except Exception as e:
         print("[CU15 ERROR]", e)
         if cooking_msg:
-            await cooking_msg.edit(
+            await safe_edit(
+                cooking_msg,
                 content="❌ Failed cooking that up."
             )
 
@@ -824,18 +970,17 @@ def parse_score(v):
 
 
 
-async def send_info_embed(channel, df, info_id, interaction=None):
+async def send_info_embed(channel, snap, info_id, interaction=None):
     # Ensure Id column exists
-    if "Id" not in df.columns:
+    if "Id" not in snap.frame.columns:
         await safe_send(channel, content="❌ No Id column in data.")
         return
     # Match base64 Id as string
-    row = df[df["Id"].astype(str) == str(info_id)]
-    if row.empty:
+    row = snap.records.get(str(info_id))
+    if row is None:
         await safe_send(channel, content="❌ No entry with that Id.")
         await maybe_send_random_message(channel, 0.99)
         return
-    row = row.iloc[0]
     name1 = safe_val(row, "Name", "Unknown")
     name = safe_val(row, "Name in game", "Unknown")
     tank = safe_val(row, "Tank", "Unknown")
@@ -890,26 +1035,26 @@ async def send_info_embed(channel, df, info_id, interaction=None):
         embed.set_footer(text=f"Healers: {row_healer}")
     embed.set_image(url=cdn_url)
     if interaction:
-        await interaction.edit_original_response(
+        await safe_reply(
+            interaction, interaction.edit_original_response,
             content=None,
             embed=embed
         )
     else:
         await safe_send(channel, embed=embed)
-async def send_description_embed(channel, df, info_id, interaction=None):
+async def send_description_embed(channel, snap, info_id, interaction=None):
     # Ensure Id column exists
-    if "Id" not in df.columns:
+    if "Id" not in snap.frame.columns:
         await safe_send(channel, content="❌ No Id column in data.")
         return
     # Find row by Id
-    row = df[df["Id"].astype(str) == str(info_id)]
-    if row.empty:
+    row = snap.records.get(str(info_id))
+    if row is None:
         await safe_send(
             channel,
             content="❌ No entry with that Id."
         )
         return
-    row = row.iloc[0]
     # Get values safely
     name1 = safe_val(row, "Name", "Unknown")
     name = safe_val(row, "Name in game", "Unknown")
@@ -947,7 +1092,8 @@ async def send_description_embed(channel, df, info_id, interaction=None):
         color=discord.Color.green()
     )
     if interaction:
-        await interaction.edit_original_response(
+        await safe_reply(
+            interaction, interaction.edit_original_response,
             content=None,
             embed=embed
         )
@@ -990,11 +1136,10 @@ async def on_ready():
         print(f"Synced {len(synced)} global slash commands")
     except Exception as e:
         print("Slash sync failed:", e)
-    try:
-        read_excel_cached()
+    if await reload_snapshot(if_missing=True):
         print("Initial data load OK")
-    except Exception as e:
-        print("Initial data load failed:", e)
+    if not watch_data_file.is_running():
+        watch_data_file.start()
     global TANK_NAMES
     TANK_NAMES = load_tanks()
     print(f"Logged in as {bot.user}")
@@ -1003,46 +1148,113 @@ async def on_ready():
 
 
 
+# Prev/Next clicks seen vs message edits actually sent
+PAGINATION_STATS = {"clicks": 0, "edits": 0, "coalesced": 0}
+
+
 class RangePaginationView(ui.View):
-    def __init__(self, df, start_index, range_size, title, shorten_tank):
+    def __init__(
+        self, df, start_index, range_size, title, shorten_tank,
+        snap=None, positions=None, columns=None
+    ):
         super().__init__(timeout=180)
-        self.df = df.reset_index(drop=True)
+        # snap: set when df rows are snapshot rows (index = positions).
+        # Then the view keeps only the positions and column names and
+        # rebuilds each page from the shared snapshot. Warm pages pass
+        # positions/columns directly with df=None.
+        self.snap = snap
+        if snap is not None and positions is not None:
+            self.df = None
+            self.positions = positions
+            self.columns = list(columns)
+        elif snap is not None and all(c in snap.frame.columns for c in df.columns):
+            self.df = None
+            self.positions = df.index.to_numpy().astype(np.int32)
+            self.columns = list(df.columns)
+        else:
+            self.snap = None
+            self.df = df
+            self.positions = None
+        self.total = len(self.positions) if self.df is None else len(df)
         self.range_size = range_size
         self.title = title
         self.shorten_tank = shorten_tank
 
         # Start page calculation
         self.page = (start_index - 1) // range_size
-        self.max_page = (len(self.df) - 1) // range_size
+        self.max_page = (self.total - 1) // range_size
+        # Click coalescing: while an edit is in flight, later clicks only
+        # move self.page and mark the view dirty
+        self.editing = False
+        self.dirty = False
+        self.latest = None
 
     async def on_timeout(self):
         for item in self.children:
             item.disabled = True
         try:
-            await self.message.edit(view=self)
+            await safe_edit(self.message, view=self)
         except:
             pass
     
     def get_slice(self):
         start = self.page * self.range_size
-        end = min(start + self.range_size, len(self.df))
+        end = min(start + self.range_size, self.total)
         # Clamp in case start < 0
         if start < 0:
-            start, end = 0, min(self.range_size, len(self.df))
+            start, end = 0, min(self.range_size, self.total)
+        if self.positions is not None:
+            rows = self.snap.frame.iloc[self.positions[start:end]]
+            return rows[self.columns], start, end
         return self.df.iloc[start:end], start, end
 
 
-    async def update(self, interaction: Interaction):
-        if interaction.response.is_done():
-            return
+    def render_page(self):
         slice_df, start, end = self.get_slice()
-        slice_df = slice_df.copy()
         slice_df["Ņ"] = range(start + 1, end + 1)
-        lines = dataframe_to_markdown_aligned(slice_df, self.shorten_tank)
+        lines = dataframe_to_markdown_aligned(slice_df, self.shorten_tank, self.snap)
         embed = make_embed(self.title, lines)
-        embed.set_footer(text=f"Rows {start+1}-{end} / {len(self.df)}")
-        await interaction.response.edit_message(embed=embed, view=self)
-        await asyncio.sleep(0.8)
+        embed.set_footer(text=f"Rows {start+1}-{end} / {self.total}")
+        return embed
+
+    async def update(self, interaction: Interaction):
+        if interaction.response.is_done():
+            return
+        PAGINATION_STATS["clicks"] += 1
+        if self.editing:
+            # An edit is already going out: just ack this click. Only an
+            # acked interaction's response can be edited, so the edit
+            # loop sees it once the defer has gone through
+            PAGINATION_STATS["coalesced"] += 1
+            await safe_reply(interaction, interaction.response.defer)
+            if not interaction.response.is_done():
+                return
+            self.latest = interaction
+            self.dirty = True
+            if self.editing:
+                return
+            # The loop finished while this click was being acked
+            interaction = None
+        self.editing = True
+        try:
+            if interaction is not None:
+                PAGINATION_STATS["edits"] += 1
+                embed = await run_compute(self.render_page)
+                await safe_reply(interaction, interaction.response.edit_message, embed=embed, view=self)
+            # Clicks that landed meanwhile collapse into one more edit
+            while self.dirty:
+                self.dirty = False
+                PAGINATION_STATS["edits"] += 1
+                embed = await run_compute(self.render_page)
+                await safe_reply(
+                    self.latest, self.latest.edit_original_response,
+                    embed=embed,
+                    view=self
+                )
+        except HTTPException as e:
+            print("Page edit failed:", e)
+        finally:
+            self.editing = False
     
 
     @ui.button(label="⬅ Prev", style=discord.ButtonStyle.secondary)
@@ -1058,26 +1270,61 @@ class RangePaginationView(ui.View):
 
 
 
-def shorten_name(name: str, max_len: int = 10) -> str:
-    name = str(name).strip()
-    if len(name) > max_len:
-        name = name[:max_len]
-    return name
 
 
+def bot_stats_lines():
+    """Cache counters for !o;stats, one line per cache."""
+    snap = CURRENT_SNAPSHOT
+    lines = [f"Snapshot v{snap.version}" if snap else "No snapshot loaded"]
+    fz = MATCH_CACHE.stats()
+    lines.append(
+        f"Fuzzy cache: {fz['size']}/{fz['maxsize']} • "
+        f"{fz['hits']} hits / {fz['misses']} misses ({fz['hit_rate']:.0%})"
+    )
+    wm = WARM_STATS
+    served = wm["hits"] + wm["live"]
+    lines.append(
+        f"Warm pages: {wm['hits']} warm / {wm['live']} live "
+        f"({wm['hits'] / served if served else 0:.0%} warm)"
+    )
+    fl = FLIGHTS.stats()
+    lines.append(
+        f"Coalescing: {fl['leaders']} computed • {fl['followers']} shared "
+        f"({fl['shared_rate']:.0%}) • {fl['in_flight']} in flight"
+    )
+    rc = RESULTS.stats()
+    lines.append(
+        f"Result cache: {rc['size']} entries • {rc['bytes'] / 2**20:.1f}/"
+        f"{rc['maxbytes'] / 2**20:.0f} MB • {rc['hits']} hits / {rc['misses']} misses "
+        f"({rc['hit_rate']:.0%}) • {rc['evictions']} evicted • {rc['expired']} expired"
+    )
+    sd = SENDS.stats()
+    lines.append(
+        f"Sends: {sd['depth']} queued (max {sd['max_depth']}) • {sd['sent']} sent • "
+        f"wait p50 {sd['wait_p50'] * 1000:.0f} ms / p95 {sd['wait_p95'] * 1000:.0f} ms • "
+        f"{sd['rate_limited']} 429s • {sd['merged']} merged • {sd['dropped']} dropped"
+    )
+    pg = PAGINATION_STATS
+    lines.append(
+        f"Pagination: {pg['clicks']} clicks • {pg['edits']} edits • "
+        f"{pg['coalesced']} coalesced"
+    )
+    rt = ROUTER.stats()
+    top = ", ".join(f"{name} {count}" for name, count in rt["top"])
+    lines.append(
+        f"Router: {rt['routes']} routes • {rt['messages']} messages • "
+        f"{rt['avg_parse_us']:.1f} µs/parse • top: {top or '-'}"
+    )
+    return lines
+
 
 def is_tejm(user):
     return user.name.lower() == "tejm_of_curonia"
 
-def normalize_score(df):
-    df = df.copy()
-    df["Score"] = pd.to_numeric(df["Score"].astype(str).str.replace(",", ""), errors="coerce").fillna(0)
-    return df
-
 def add_index(df):
-    df = df.reset_index(drop=True)
-    df["Ņ"] = range(1, len(df) + 1)
-    return df
+    # Row labels are kept: for snapshot rows they are the positions
+    # dataframe_to_markdown_aligned(..., snap) reads cells by
+    return df.assign(**{"Ņ": range(1, len(df) + 1)})
 
 def parse_range(text, max_range=20):
     try:
@@ -1088,94 +1335,56 @@ def parse_range(text, max_range=20):
     except:
         return None
 
-def dataframe_to_markdown_aligned(df, shorten_tank=True):
-    df = df.copy()
-
-    if FIRST_COLUMN in df.columns:
-        df[FIRST_COLUMN] = df[FIRST_COLUMN].apply(
-            lambda v: f"{float(v) / 1_000_000:,.3f} M"
-        )
-
-    if "Date" in df.columns:
-        df["Date"] = df["Date"].astype(str).str[:10]
-        
-    if "Name" in df.columns:
-        df["Name"] = df["Name"].apply(lambda n: shorten_name(n, 10))
-    
-    if shorten_tank and "Tank" in df.columns:
-        df["Tank"] = (
-            df["Tank"]
-            .astype(str)
-            .str.lower()
-            .replace({"triple": "t", "auto": "a", "hexa": "h"}, regex=True)
-            .str.title()
-            .str[:8]
-        )
-
-    rows = [df.columns.tolist()] + df.values.tolist()
-    widths = [max(wcswidth(str(r[i])) for r in rows) for i in range(len(df.columns))]
-
-    def fmt(row):
-        return " " + " | ".join(
-            str(v) + " " * (widths[i] - wcswidth(str(v)))
-            for i, v in enumerate(row)
-        ) + " "
-
-    return (
-        [fmt(df.columns)]
-        + ["-" + "-".join("-" * w for w in widths) + " -"]
-        + [fmt(r) for r in df.values]
-    )
+def dataframe_to_markdown_aligned(df, shorten_tank=True, snap=None):
+    """
+    Pass `snap` only when df holds unmodified snapshot rows (index = row
+    positions, Ņ may be renumbered): their cells come pre-formatted.
+    """
+    return frame_table(df, shorten_tank, snap.display if snap else None)
 
 
 
 
-def handle_record_each(df, name, personal=False):
+def handle_record_each(snap, name, personal=False, mask=None):
     """
     personal=False -> tanks where the player holds the global #1 score
     personal=True  -> player's personal best score on each tank
     """
-    df = normalize_score(df)
     if personal:
-        # Only this player's scores
-        player_df = df[df["Name"].str.lower() == name.lower()].copy()
-        # Keep only their best score per tank
-        return (
-            player_df.sort_values("Score", ascending=False)
-                     .drop_duplicates("Tank")
-                     .sort_values("Score", ascending=False)
-        )
+        # Player's rows are already best-first: keep the first per tank
+        return handle_name(snap, name, mask).drop_duplicates("Tank")
     # Existing global-record mode
-    best_per_tank = (
-        df.sort_values("Score", ascending=False)
-          .drop_duplicates("Tank")
-    )
-    return best_per_tank[
-        best_per_tank["Name"].str.lower() == name.lower()
-    ].sort_values("Score", ascending=False)
+    best_per_tank = snap.rows(snap.best_rows("Tank", mask))
+    return best_per_tank[best_per_tank["name_key"] == name.lower()]
 
 
 
 
 
-async def handle_records_player(message, df, parts):
+async def handle_records_player(message, snap, parts, mask=None, key=None):
     # Detect + anywhere after the player name
     personal_mode = any(p.strip() == "+" for p in parts[3:])
     name_input = parts[2].strip()
     name = await fuzzy_or_abort(
         message=message,
-        df=df,
+        snap=snap,
+        column="Name",
+        mask=mask,
         user_input=name_input,
-        choices=df["Name"].dropna().unique(),
+        parts=parts,
         arg_index=2,
-        resolver=lambda d, n: handle_record_each(d, n, personal=personal_mode),
+        resolver=lambda s, n: handle_record_each(s, n, personal=personal_mode),
         title="Player not found — did you mean?",
         result_title="Player Records",
         columns=["Ņ", "Score", "Tank", "Date", "Id"]
     )
     if name is None:
         return
-    df_filtered = handle_record_each(df, name, personal=personal_mode)
+    if key is not None:
+        key += (name, personal_mode)
+    df_filtered = await compute_once(
+        key, handle_record_each, snap, name, personal=personal_mode, mask=mask
+    )
     if df_filtered.empty:
         if personal_mode:
             await safe_send(
@@ -1206,11 +1415,14 @@ async def handle_records_player(message, df, parts):
         start_index=start,
         range_size=range_size,
         title=title,
-        shorten_tank=True
+        shorten_tank=True,
+        snap=snap
     )
-    slice_df = df_filtered.iloc[start-1:end].copy()
+    slice_df = df_filtered.iloc[start-1:end]
     slice_df["Ņ"] = range(start, min(end, len(df_filtered)) + 1)
-    lines = dataframe_to_markdown_aligned(slice_df)
+    lines = await compute_once(
+        key and key + (start, end), dataframe_to_markdown_aligned, slice_df, snap=snap
+    )
     embed = make_embed(title, lines)
     footer = f"Rows {start}-{min(end, len(df_filtered))} / {len(df_filtered)}"
     if warning:
@@ -1232,7 +1444,7 @@ async def send_embed_table(channel, title, lines, page=1, total=1):
     embed = make_embed(title, lines)
 
     embed.set_footer(text=f"Page {page}/{total}")
-    await channel.send(embed=embed)
+    await safe_send(channel, embed=embed)
 
 
 
@@ -1243,28 +1455,25 @@ async def fuzzy_or_abort(
     *,
     message,
     interaction: Interaction | None = None,
-    df,
+    snap,
+    column,
     user_input,
-    choices,
     arg_index,
     resolver,
     title,
     result_title,
     columns,
+    parts=None,
+    mask=None,
     max_results=5,
     cutoff=0.65
 ):
-    lookup = {str(c).lower(): str(c) for c in choices if pd.notna(c)}
-
-    key = user_input.lower()
-    if key in lookup:
-        return lookup[key]
-    matches = get_close_matches(
-        key,
-        lookup.keys(),
-        n=max_results,
-        cutoff=cutoff
+    # Same exact-then-fuzzy resolution as x! and the slash commands
+    resolved, matches = snap.vocab.resolve(
+        column, user_input, mask, n=max_results, cutoff=cutoff
     )
+    if resolved is not None:
+        return resolved
     # ❌ No matches at all
     if not matches:
         await safe_send(
@@ -1273,6 +1482,9 @@ async def fuzzy_or_abort(
         )
         return None
     #  Did you mean?
+    lookup = snap.vocab.table(column, mask)
+    if parts is None:
+        parts = message.content.split(";")
     embed = Embed(
         title=title,
         description="Choose the correct option below.",
@@ -1282,8 +1494,7 @@ async def fuzzy_or_abort(
         cmd=message.content,
         message_source=message,
         channel=message.channel,
-        df=df,
-        parts=message.content.split(";"),
+        parts=parts,
         index=arg_index,
         resolver=resolver,
         title=result_title,
@@ -1295,7 +1506,7 @@ async def fuzzy_or_abort(
         embed.add_field(name=original, value="\u200b", inline=True)  # optional, just to keep field
         view.add_item(DidYouMeanButton(original))
     if interaction:
-        await interaction.edit_original_response(embed=embed, view=view)
+        await safe_reply(interaction, interaction.edit_original_response, embed=embed, view=view)
         view.message = await interaction.original_response()
     else:
         msg = await safe_send(message.channel, embed=embed, view=view)
@@ -1305,53 +1516,49 @@ async def fuzzy_or_abort(
 
 
 
+def random_analysis_lines(snap, mode, mask=None):
+    output = handle_random_analysis(snap, mode, mask)
+    # 14-character tank names only for this command
+    output = output.assign(Tank=output["Tank"].astype(str).str[:14])
+    return dataframe_to_markdown_aligned(output, shorten_tank=False)
+
+
 class RandomAnalysisView(ui.View):
-    def __init__(self, df, mode):
+    def __init__(self, snap, mode, mask=None):
         super().__init__(timeout=180)
-        self.df = df
+        self.snap = snap
         self.mode = mode
+        self.mask = mask
     async def on_timeout(self):
         for item in self.children:
             item.disabled = True
         try:
-            await self.message.edit(view=self)
+            await safe_edit(self.message, view=self)
         except:
             pass
     @ui.button(label="🎲 Reroll", style=discord.ButtonStyle.secondary)
     async def reroll(self, interaction: discord.Interaction, _):
-        output = handle_random_analysis(self.df, self.mode)
-        lines = dataframe_to_markdown_aligned(output, shorten_tank=False)
-        # 14-character tank names only for this command
-        output = output.copy()
-        output["Tank"] = output["Tank"].astype(str).str[:14]
-        lines = dataframe_to_markdown_aligned(output, shorten_tank=False)
+        lines = await run_compute(
+            random_analysis_lines, self.snap, self.mode, self.mask
+        )
         embed = make_embed("Random Recommendations", lines)
         embed.set_footer(text="very!")
-        await interaction.response.edit_message(embed=embed, view=self)
+        await safe_reply(interaction, interaction.response.edit_message, embed=embed, view=self)
 
 
 
 
 
-def handle_best(df):
-    df = normalize_score(df)
-    return (
-        df.sort_values("Score", ascending=False)
-          .drop_duplicates("Name")
-    )
+def handle_best(snap, mask=None):
+    return snap.rows(snap.best_rows("Name", mask))
 
 
-def handle_name(df, name):
-    df = normalize_score(df)
-    return (
-        df[df["Name"].str.lower() == name.lower()]
-        .sort_values("Score", ascending=False)
-    )
+def handle_name(snap, name, mask=None):
+    return snap.rows(snap.player_rows.get(name.lower(), NO_ROWS), mask)
 
 
-def handle_tank(df, tank):
-    df = normalize_score(df)
-    return df[df["Tank"].str.lower() == tank.lower()].sort_values("Score", ascending=False)
+def handle_tank(snap, tank, mask=None):
+    return snap.rows(snap.tank_rows.get(tank.lower(), NO_ROWS), mask)
 
 def extract_range(parts, max_range=20, total_len=0):
     """
@@ -1389,174 +1596,106 @@ def extract_range(parts, max_range=20, total_len=0):
 # x!Something — automatic Player/Tank leaderboard lookup
 # ============================================================
 
-def x_lookup_exact(df, query):
+def x_lookup_exact(snap, query):
     """Return exact case-insensitive matches for Name and Tank."""
-    key = str(query).strip().lower()
+    return snap.vocab.player(query), snap.vocab.tank(query)
 
-    player_matches = {
-        str(v).strip().lower(): str(v).strip()
-        for v in df["Name"].dropna().unique()
-    }
-    tank_matches = {
-        str(v).strip().lower(): str(v).strip()
-        for v in df["Tank"].dropna().unique()
-    }
 
-    return player_matches.get(key), tank_matches.get(key)
-
-
-def x_lookup_fuzzy(df, query, max_results=5, cutoff=0.65):
+def x_lookup_fuzzy(snap, query, max_results=5, cutoff=0.65):
     """
     Fuzzy-search both Name and Tank columns.
     Returns:
         [("player", display_name), ("tank", display_name), ...]
     """
-    player_lookup = {
-        str(v).strip().lower(): str(v).strip()
-        for v in df["Name"].dropna().unique()
-    }
-    tank_lookup = {
-        str(v).strip().lower(): str(v).strip()
-        for v in df["Tank"].dropna().unique()
-    }
-    # Combine the actual searchable names.
-    # If the same name exists as both a player and tank,
-    # keep both types.
-    candidates = {}
-    for key, value in player_lookup.items():
-        candidates.setdefault(key, []).append(("player", value))
-    for key, value in tank_lookup.items():
-        candidates.setdefault(key, []).append(("tank", value))
+    vocab = snap.vocab
+    # vocab.kinds keeps both types when the same name
+    # exists as a player and a tank.
     query_key = str(query).strip().lower()
     # IMPORTANT:
     # Compare against the actual name, NOT "player:name"
-    matches = get_close_matches(
+    matches = vocab.any_fuzzy.close_matches(
         query_key,
-        list(candidates.keys()),
         n=max_results,
         cutoff=cutoff
     )
     results = []
     for match in matches:
-        for kind, value in candidates[match]:
+        for kind, value in vocab.kinds[match]:
             results.append((kind, value))
     return results[:max_results]
 
 
 
-def x_tank_output(df, tank):
+def x_tank_output(snap, tank):
     """
     Same display columns as !o;t:
     Ņ, Score, Name, Date, Id
     """
-    output = handle_tank(df, tank).copy()
+    output = handle_tank(snap, tank)
     if output.empty:
         return output
 
-    output = output[["Score", "Name", "Date", "Id"]].copy()
+    output = output[["Score", "Name", "Date", "Id"]]
     output.insert(0, "Ņ", range(1, len(output) + 1))
     return output
 
 
 
 
-def x_player_output(df, name):
+def x_player_output(snap, name):
     """
     Same display columns as !o;n:
     Ņ, Score, Tank, Date, Id
     """
-    output = handle_name(df, name).copy()
+    output = handle_name(snap, name)
     if output.empty:
         return output
-    output = output[["Score", "Tank", "Date", "Id"]].copy()
+    output = output[["Score", "Tank", "Date", "Id"]]
     output.insert(0, "Ņ", range(1, len(output) + 1))
     return output
 
 
 
 
-def handle_name(df, name):
-    df = normalize_score(df)
-    return (
-        df[df["Name"].str.lower() == name.lower()]
-        .sort_values("Score", ascending=False)
-    )
-
-
+# kind -> (rows for that leaderboard, same columns as !o;n / !o;t)
+X_OUTPUTS = {"player": x_player_output, "tank": x_tank_output}
 
 
-async def show_x_player(message, df, name):
-    output = x_player_output(df, name)
+async def show_x_scores(message, snap, kind, value, parts):
+    key = (snap.version, X_PREFIX, kind, value)
+    output = await compute_once(key, X_OUTPUTS[kind], snap, value)
 
     if output.empty:
         await safe_send(
             message.channel,
-            content=f"❌ No scores found for **{name}**."
+            content=f"❌ No scores found for **{value}**."
         )
         return
 
     start, end, range_size, warning = extract_range(
-        message.content.split(";"),
+        parts,
         max_range=20,
         total_len=len(output)
     )
 
-    title = f"All scores of {name}"
+    title = f"All scores of {value}"
 
     view = RangePaginationView(
         df=output,
         start_index=start,
         range_size=range_size,
         title=title,
-        shorten_tank=True
+        shorten_tank=True,
+        snap=snap
     )
 
-    slice_df = output.iloc[start - 1:end].copy()
+    slice_df = output.iloc[start - 1:end]
     slice_df["Ņ"] = range(start, min(end, len(output)) + 1)
 
-    lines = dataframe_to_markdown_aligned(slice_df, shorten_tank=True)
-    embed = make_embed(title, lines)
-
-    footer = f"Rows {start}-{min(end, len(output))} / {len(output)}"
-    if warning:
-        footer = f"{warning} • {footer}"
-    embed.set_footer(text=footer)
-
-    msg = await safe_send(message.channel, embed=embed, view=view)
-    view.message = msg
-
-
-async def show_x_tank(message, df, tank):
-    output = x_tank_output(df, tank)
-
-    if output.empty:
-        await safe_send(
-            message.channel,
-            content=f"❌ No scores found for **{tank}**."
-        )
-        return
-
-    start, end, range_size, warning = extract_range(
-        message.content.split(";"),
-        max_range=20,
-        total_len=len(output)
-    )
-
-    title = f"All scores of {tank}"
-
-    view = RangePaginationView(
-        df=output,
-        start_index=start,
-        range_size=range_size,
-        title=title,
-        shorten_tank=True
+    lines = await compute_once(
+        key + (start, end),
+        dataframe_to_markdown_aligned, slice_df, shorten_tank=True, snap=snap
     )
-
-    slice_df = output.iloc[start - 1:end].copy()
-    slice_df["Ņ"] = range(start, min(end, len(output)) + 1)
-
-    # Same column layout as !o;t.
-    lines = dataframe_to_markdown_aligned(slice_df, shorten_tank=True)
     embed = make_embed(title, lines)
 
     footer = f"Rows {start}-{min(end, len(output))} / {len(output)}"
@@ -1577,10 +1716,9 @@ class XLookupChoiceView(ui.View):
         x!t;Something
     """
 
-    def __init__(self, message_source, df, player_name, tank_name):
+    def __init__(self, message_source, player_name, tank_name):
         super().__init__(timeout=30)
         self.message_source = message_source
-        self.df = df
         self.player_name = player_name
         self.tank_name = tank_name
         self.message = None
@@ -1590,7 +1728,7 @@ class XLookupChoiceView(ui.View):
             item.disabled = True
         if self.message:
             try:
-                await self.message.edit(view=self)
+                await safe_edit(self.message, view=self)
             except:
                 pass
 
@@ -1601,7 +1739,8 @@ class XLookupChoiceView(ui.View):
         fake_message.content = command
 
         try:
-            await interaction.edit_original_response(
+            await safe_reply(
+                interaction, interaction.edit_original_response,
                 content=f"Cooking...",
                 embed=None,
                 view=None
@@ -1630,10 +1769,9 @@ class XLookupChoiceView(ui.View):
 
 
 class XLookupFuzzyView(ui.View):
-    def __init__(self, message_source, df):
+    def __init__(self, message_source):
         super().__init__(timeout=30)
         self.message_source = message_source
-        self.df = df
         self.message = None
 
     async def on_timeout(self):
@@ -1641,13 +1779,13 @@ class XLookupFuzzyView(ui.View):
             item.disabled = True
         if self.message:
             try:
-                await self.message.edit(view=self)
+                await safe_edit(self.message, view=self)
             except:
                 pass
 
 
 class XFuzzyButton(ui.Button):
-    def __init__(self, label, kind, message_source, df):
+    def __init__(self, label, kind, message_source):
         super().__init__(
             label=label[:80],
             style=(
@@ -1659,7 +1797,6 @@ class XFuzzyButton(ui.Button):
         self.kind = kind
         self.value = label
         self.message_source = message_source
-        self.df = df
 
     async def callback(self, interaction: Interaction):
         await interaction.response.defer()
@@ -1674,7 +1811,8 @@ class XFuzzyButton(ui.Button):
         fake_message.content = command
 
         try:
-            await interaction.edit_original_response(
+            await safe_reply(
+                interaction, interaction.edit_original_response,
                 content=f"Cooking...",
                 embed=None,
                 view=None
@@ -1688,7 +1826,7 @@ class XFuzzyButton(ui.Button):
         )
 
 
-async def handle_x_lookup(message, df, query):
+async def handle_x_lookup(message, snap, query, parts):
     """
     x!Something
 
@@ -1709,14 +1847,14 @@ async def handle_x_lookup(message, df, query):
         )
         return
 
-    player_match, tank_match = x_lookup_exact(df, query)
+    player_match, tank_match = x_lookup_exact(snap, query)
 
     if player_match and not tank_match:
-        await show_x_player(message, df, player_match)
+        await show_x_scores(message, snap, "player", player_match, parts)
         return
 
     if tank_match and not player_match:
-        await show_x_tank(message, df, tank_match)
+        await show_x_scores(message, snap, "tank", tank_match, parts)
         return
 
     if player_match and tank_match:
@@ -1731,7 +1869,6 @@ async def handle_x_lookup(message, df, query):
 
         view = XLookupChoiceView(
             message_source=message,
-            df=df,
             player_name=player_match,
             tank_name=tank_match
         )
@@ -1747,7 +1884,7 @@ async def handle_x_lookup(message, df, query):
     # --------------------------------------------------------
     # Fuzzy matching across BOTH columns
     # --------------------------------------------------------
-    matches = x_lookup_fuzzy(df, query, max_results=5, cutoff=0.65)
+    matches = x_lookup_fuzzy(snap, query, max_results=5, cutoff=0.65)
 
     if not matches:
         await safe_send(
@@ -1765,15 +1902,14 @@ async def handle_x_lookup(message, df, query):
         color=discord.Color.red()
     )
 
-    view = XLookupFuzzyView(message, df)
+    view = XLookupFuzzyView(message)
 
     for kind, value in matches:
         view.add_item(
             XFuzzyButton(
                 label=value,
                 kind=kind,
-                message_source=message,
-                df=df
+                message_source=message
             )
         )
 
@@ -1786,700 +1922,612 @@ async def handle_x_lookup(message, df, query):
 
 
 
+# ============================================================
+# Command dispatch
+# ============================================================
+# A message is parsed once (router.py) into a Command; the Route
+# registered for it says which addons apply, the handler does the rest.
+# Handlers take (message, snap, command, mask). The ones that list rows
+# return (output, title) and send_result_table() draws the page.
+
 async def process_olympus_command(
     message,
     bypass_cooldown=False
 ):
-    # ========================================================
-    # x!Something automatic Player/Tank lookup
-    # ========================================================
-    if message.content.startswith("x!"):
-        raw = message.content[2:].strip()
-
-        if not raw:
-            await safe_send(
-                message.channel,
-                content="❌ Usage: `x!Something`"
-            )
-            return
+    # --- Debug: show every message received ---
+    print(f"[DEBUG] Received message from {message.author}: {message.content}")
+    if message.author == bot.user:
+        return
 
-        # Internal rewritten commands from the buttons.
-        if raw.startswith("p;"):
-            name = raw[2:].strip()
+    command = ROUTER.parse(message.content)
+    if command is None:
+        await bot.process_commands(message)
+        return
 
-            if not name:
-                await safe_send(
-                    message.channel,
-                    content="❌ Usage: `x!p;PlayerName`"
-                )
-                return
-
-            df_x = read_excel_cached()
-
-            if isinstance(df_x, str) or df_x.empty:
-                await safe_send(
-                    message.channel,
-                    content="❌ Data unavailable."
-                )
-                return
-
-            df_x.columns = df_x.columns.str.strip()
+    # x! lookups have no cooldown, !o; commands do
+    if command.prefix == PREFIX and not bypass_cooldown:
+        now = time.time()
+        if (
+            now - user_cooldowns.get(message.author.id, 0)
+            < COOLDOWN_SECONDS
+        ):
+            print(
+                f"[DEBUG] Cooldown active for {message.author}"
+            )
+            return
+        user_cooldowns[message.author.id] = now
 
-            lookup = {
-                str(v).strip().lower(): str(v).strip()
-                for v in df_x["Name"].dropna().unique()
-            }
+    route = command.route
+    if route is None:
+        return
 
-            # Exact first, then fuzzy.
-            resolved = lookup.get(name.lower())
+    # Shared snapshot frame: never assign into it, derive new frames instead
+    snap = await get_snapshot()
+    if snap is None or snap.frame.empty:
+        await safe_send(message.channel, content="❌ Data unavailable.")
+        return
 
-            if resolved is None:
-                matches = get_close_matches(
-                    name.lower(),
-                    list(lookup.keys()),
-                    n=1,
-                    cutoff=0.50
-                )
-                if matches:
-                    resolved = lookup[matches[0]]
+    if route.owner and not is_tejm(message.author):
+        await safe_send(message.channel, content="Restricted command.")
+        return
 
-            if resolved is None:
-                await safe_send(
-                    message.channel,
-                    content=f"❌ Player `{name}` not found."
-                )
-                return
+    # --- Date filter addon ---
+    # Boolean row mask over the snapshot, for index-backed handlers
+    row_mask = None
+    if command.date:
+        date_operator, date_target = command.date
+        row_mask = snap.date_mask(date_operator, date_target)
 
-            await show_x_player(message, df_x, resolved)
+        # if filtering removed everything, warn early
+        if not row_mask.any():
+            await safe_send(
+                message.channel,
+                content=f"❌ No results for {date_operator or '='}{date_target}"
+            )
             return
 
-        if raw.startswith("t;"):
-            tank = raw[2:].strip()
+    # --- GT filter addon ---
+    # Not joined here: handlers resolve names on the date rows first and
+    # AND the GT mask in before sorting, see gt_rows()
 
-            if not tank:
-                await safe_send(
-                    message.channel,
-                    content="❌ Usage: `x!t;TankName`"
-                )
-                return
-
-            df_x = read_excel_cached()
-
-            if isinstance(df_x, str) or df_x.empty:
-                await safe_send(
-                    message.channel,
-                    content="❌ Data unavailable."
-                )
+    # Default first page of a hot board: already rendered
+    if route.warm:
+        plain = row_mask is None and not any(p.strip() for p in command.parts[2:])
+        page = warm_page(snap, command.name) if plain else None
+        if page is None:
+            WARM_STATS["live"] += 1
+        else:
+            if command.name == "c":
+                await maybe_send_random_message(message.channel, 0.99)
+            elif command.name == "p":
+                await maybe_send_random_message(message.channel, 0.05)
+            embed, view = warm_page_message(snap, page)
+            if view is None:
+                await safe_send(message.channel, embed=embed)
                 return
+            msg = await safe_send(message.channel, embed=embed, view=view)
+            view.message = msg
+            return
 
-            df_x.columns = df_x.columns.str.strip()
-
-            lookup = {
-                str(v).strip().lower(): str(v).strip()
-                for v in df_x["Tank"].dropna().unique()
-            }
+    result = await route.handler(message, snap, command, row_mask)
+    if result is not None:
+        output, title = result
+        await send_result_table(message, snap, command, output, title, row_mask)
 
-            # Exact first, then fuzzy.
-            resolved = lookup.get(tank.lower())
 
-            if resolved is None:
-                matches = get_close_matches(
-                    tank.lower(),
-                    list(lookup.keys()),
-                    n=1,
-                    cutoff=0.50
-                )
-                if matches:
-                    resolved = lookup[matches[0]]
+def gt_rows(snap, command, mask):
+    """`mask` with the command's GT addon ANDed in (unchanged without one)."""
+    if not command.gt or "GT" not in snap.frame.columns:
+        return mask
+    return combine_masks(mask, snap.gt_mask(command.gt))
 
-            if resolved is None:
-                await safe_send(
-                    message.channel,
-                    content=f"❌ Tank `{tank}` not found."
-                )
-                return
 
-            await show_x_tank(message, df_x, resolved)
-            return
-
-        df_x = read_excel_cached()
-
-        if isinstance(df_x, str) or df_x.empty:
+async def send_result_table(message, snap, command, output, title, row_mask):
+    if output is None or output.empty:
+        if command.gt:
             await safe_send(
                 message.channel,
-                content="❌ Data unavailable."
+                content=f"No results for GT={command.gt}."
             )
             return
+        await safe_send(message.channel, content="No results.")
+        await bot.process_commands(message)
+        return
 
-        df_x.columns = df_x.columns.str.strip()
+    cols = [c for c in command.route.columns if c in output.columns]
+    output = output[cols]
 
-        await handle_x_lookup(
-            message,
-            df_x,
-            raw
-        )
-        return
+    start, end, range_size, warning = extract_range(
+        command.parts, max_range=20, total_len=len(output)
+    )
 
-    
-    # --- Debug: show every message received ---
-    print(f"[DEBUG] Received message from {message.author}: {message.content}")
-    if message.author == bot.user:
-        return
+    # Rows are untouched snapshot rows, except !o;e re-ranked for a filter
+    table_snap = None if command.name == "e" and row_mask is not None else snap
+    shorten_tank = True
+    view = RangePaginationView(
+        df=output,
+        start_index=start,
+        range_size=range_size,
+        title=title,
+        shorten_tank=shorten_tank,
+        snap=table_snap
+    )
+    slice_df = output.iloc[start-1:end]
+    slice_df["Ņ"] = range(start, min(end, len(output)) + 1)
+    lines = await compute_once(
+        query_key(snap, command, title, start, end),
+        dataframe_to_markdown_aligned, slice_df, shorten_tank, table_snap
+    )
+    embed = make_embed(title, lines)
+    footer = f"Rows {start}-{min(end, len(output))} / {len(output)}"
+    if warning:
+        footer = f"{warning} • {footer}"
 
-    # --------------------------------------------------------
-    # New x!Something command
-    # Searches both Name and Tank columns.
-    # --------------------------------------------------------
-    if message.content.startswith("x!"):
-        raw = message.content[2:].strip()
-        df_x = read_excel_cached()
-        if isinstance(df_x, str) or df_x.empty:
-            await safe_send(message.channel, content="❌ Data unavailable.")
-            return
-        df_x.columns = df_x.columns.str.strip()
-        await handle_x_lookup(message, df_x, raw)
-        return
+    embed.set_footer(text=footer)
 
-    if not message.content.startswith("!o;"):
-        await bot.process_commands(message)
-        return
 
-    
-    if not bypass_cooldown:    
-        now = time.time()
-        if (
-            now - user_cooldowns.get(message.author.id, 0)
-            < COOLDOWN_SECONDS
-        ):
-            print(
-                f"[DEBUG] Cooldown active for {message.author}"
-            )
-            return
-        user_cooldowns[message.author.id] = now
-    parts = message.content.split(";")
-    
-    
-    if len(parts) < 2:
-        return
-    cmd = parts[1].lower()
+    msg = await safe_send(message.channel, embed=embed, view=view)
+    view.message = msg
+    await bot.process_commands(message)
 
-    # --- Load Excel first ---
-    df = read_excel_cached()
-    print(f"[DEBUG] read_excel_cached returned type: {type(df)}")
-    if isinstance(df, pd.DataFrame):
-        print(f"[DEBUG] DataFrame shape: {df.shape}, columns: {df.columns.tolist()}")
-    else:
-        await safe_send(message.channel, content="❌ Data unavailable.")
-        return
 
-    # --- Date filter addon ---
-    date_pattern = re.compile(r'([<>=]?)(\d{4}-\d{2}-\d{2}|\d{2}-\d{2}-\d{4})')
-    date_operator = None
-    date_target = None
-
-    for p in parts[2:]:  # skip cmd
-        match = date_pattern.fullmatch(p.strip())
-        if match:
-            date_operator, date_str = match.groups()
-            if re.match(r"\d{2}-\d{2}-\d{4}", date_str):
-                d, m, y = date_str.split("-")
-                date_target = f"{y}-{m}-{d}"
-            else:
-                date_target = date_str
-            break  # only first date addon considered
-
-    if date_target:
-        df["Date"] = df["Date"].astype(str).str[:10]
-        if date_operator == "<":
-            df = df[df["Date"] < date_target]
-        elif date_operator == ">":
-            df = df[df["Date"] > date_target]
-        else:  # "=" or None
-            df = df[df["Date"] == date_target]
+# ---------------- x! ----------------
+# x!Something searches both Name and Tank; the buttons it shows
+# rewrite the message to x!p;Name / x!t;Tank.
 
-        # if filtering removed everything, warn early
-        if df.empty:
-            await safe_send(
-                message.channel,
-                content=f"❌ No results for {date_operator or '='}{date_target}"
-            )
-            return
+# command name -> (vocabulary column, kind, usage)
+X_BOARDS = {
+    "p": ("Name", "player", "❌ Usage: `x!p;PlayerName`", "Player"),
+    "t": ("Tank", "tank", "❌ Usage: `x!t;TankName`", "Tank"),
+}
 
-    # ... continue with your normal cmd handling (p, b, n, t, etc.)
-    
 
+@ROUTER.command(X_PREFIX, "")
+async def cmd_x_lookup(message, snap, command, mask=None):
+    await handle_x_lookup(message, snap, command.arg, command.parts)
 
 
-    
-    if isinstance(df, str):
-        if df == "html_error":
-            await safe_send(message.channel, content="Curses, data rate-limited! Try again in a few minutes.")
-        else:
-            await safe_send(message.channel, content="If you are reading this, Tejm messed up.")
+@ROUTER.command(X_PREFIX, "p", "t")
+async def cmd_x_board(message, snap, command, mask=None):
+    column, kind, usage, label = X_BOARDS[command.name]
+    if not command.arg:
+        await safe_send(message.channel, content=usage)
         return
-    if df.empty:
-        await safe_send(message.channel, content="Curses, data rate-limited! Try again in a few minutes.")
+    # Exact first, then the single closest name
+    resolved = snap.vocab.closest(column, command.arg, cutoff=0.50)
+    if resolved is None:
+        await safe_send(
+            message.channel,
+            content=f"❌ {label} `{command.arg}` not found."
+        )
         return
-    
-    df.columns = df.columns.str.strip()
+    await show_x_scores(message, snap, kind, resolved, command.parts)
 
-    output = None
-    shorten_tank = True
 
-    if cmd == "a":
-        if not is_tejm(message.author):
-            await safe_send(message.channel, content="Restricted command.")
-            return
-        output = df.copy()
+# ---------------- !o; tables ----------------
 
-    elif cmd == "b":
-        output = handle_best(df)
-        
-    elif cmd == "n":
-        if len(parts) < 3:
-            await safe_send(
-                message.channel,
-                content="❌ Usage: !o;n;PlayerName"
-            )
-            return
-        name_input = parts[2].strip()
-        name = await fuzzy_or_abort(
-            message=message,
-            df=df,
-            user_input=name_input,
-            choices=df["Name"].dropna().unique(),
-            arg_index=2,
-            resolver=handle_name,
-            title="Player not found — did you mean?",
-            result_title="Player Scores",
-            columns=["Ņ", "Tank", "Score", "Date", "Id"]
-        )
-        if name is None:
-            return
-        output = handle_name(df, name)
-        # ✅ SET TITLE HERE
-        title = f"All scores of {name}"
+@ROUTER.command(PREFIX, "a", gt=True, owner=True, columns=COLUMNS_DEFAULT)
+async def cmd_all(message, snap, command, mask=None):
+    mask = gt_rows(snap, command, mask)
+    output = (
+        snap.frame if mask is None
+        else await compute_once(query_key(snap, command), lambda: snap.frame[mask])
+    )
+    return output, "All Scores"
 
-    
-    elif cmd == "nt":
-        await handle_name_tank(message, df, parts)
-        return
 
-    elif cmd == "c":
-        output = normalize_score(df).sort_values("Score", ascending=False).drop_duplicates("Tank")
-        await maybe_send_random_message(message.channel, 0.99)
-        
-    elif cmd == "p":
-        output = normalize_score(df).sort_values("Score", ascending=False)
-        await maybe_send_random_message(message.channel, 0.05)
-
-    elif cmd == "t":
-        tank_input = parts[2].strip()
-        tank = await fuzzy_or_abort(
-            message=message,
-            df=df,
-            user_input=tank_input,
-            choices=df["Tank"].dropna().unique(),
-            arg_index=2,
-            resolver=handle_tank,
-            title="Tank not found — did you mean?",
-            result_title="Tank Scores",
-            columns=["Ņ", "Name", "Score", "date", "Id"]
-        )
-        if tank is None:
-            return
-        output = handle_tank(df, tank)
-        await maybe_send_random_message(message.channel, 0.05)
-        # ✅ SET TITLE HERE
-        title = f"All scores of {tank}"
+@ROUTER.command(PREFIX, "b", gt=True, warm=True, columns=COLUMNS_DEFAULT)
+async def cmd_best(message, snap, command, mask=None):
+    mask = gt_rows(snap, command, mask)
+    output = await compute_once(query_key(snap, command), handle_best, snap, mask)
+    return output, "Best Players"
 
 
-    elif cmd == "e":
-        if len(parts) < 3:
-            await safe_send(
-                message.channel,
-                content="❌ Usage: !o;e;PlayerName"
-            )
-            return
-        name_input = parts[2].strip()
-        name = await fuzzy_or_abort(
-            message=message,
-            df=df,
-            user_input=name_input,
-            choices=df["Name"].dropna().unique(),
-            arg_index=2,
-            resolver=handle_name_extended,
-            title="Player not found — did you mean?",
-            result_title="Player Scores",
-            columns=["Ņ", "Score", "Tank", "LB", "Tank LB", "Id"]
-        )
-        if name is None:
-            return
-        output = handle_name_extended(df, name)
-        if output.empty:
-            await safe_send(
-                message.channel,
-                content=f"❌ No scores found for **{name}**."
-            )
-            return
-        # Display order
-        output = output[
-            ["Score", "Tank", "LB", "Tank LB", "Id"]
-        ].copy()
-        # Local row number, same idea as !o;n
-        output.insert(0, "Ņ", range(1, len(output) + 1))
-        title = f"All scores of {name} — Extended"
-        
+@ROUTER.command(PREFIX, "c", gt=True, warm=True, columns=COLUMNS_C)
+async def cmd_best_tanks(message, snap, command, mask=None):
+    mask = gt_rows(snap, command, mask)
+    output = await compute_once(
+        query_key(snap, command),
+        lambda: snap.rows(snap.best_rows("Tank", mask))
+    )
+    await maybe_send_random_message(message.channel, 0.99)
+    return output, "Best Per Tank"
 
-    
-    elif cmd == "say":
-        msgs = load_messages()
-        if not msgs:
-            await safe_send(message.channel, content="❌ No messages loaded.")
-            return
 
-        await message.delete()
-        await safe_send(message.channel, content=random.choice(msgs))
-        return
+@ROUTER.command(PREFIX, "p", gt=True, warm=True, columns=COLUMNS_DEFAULT)
+async def cmd_leaderboard(message, snap, command, mask=None):
+    mask = gt_rows(snap, command, mask)
+    output = await compute_once(
+        query_key(snap, command),
+        lambda: snap.rows(snap.ordered(mask))
+    )
+    await maybe_send_random_message(message.channel, 0.05)
+    return output, "Leaderboard"
 
 
-    elif cmd == "w":
-        """
-        !o;w;1-15
-        Means:
-        show all rows where nu >= 1 and nu <= 15
-        Max allowed range:
-        20
-        Examples:
-        !o;w;1-15
-        !o;w;40-50
-        !o;w;100-120
-        """
-        if "nu" not in df.columns:
-            await safe_send(
-                message.channel,
-                content="❌ No 'nu' column found in data."
-            )
-            return
-        # default values
-        start_nu = 1
-        end_nu = 15
-        warning = None
-        # read explicit nu range from command
-        for p in parts:
-            if "-" in p:
-                try:
-                    a, b = map(int, p.split("-"))
-                    if a > b:
-                        a, b = b, a
-                    # MAX RANGE = 20
-                    if (b - a) > 20:
-                        warning = "❌ Max NU range is 20!"
-                        b = a + 20
-                    start_nu = a
-                    end_nu = b
-                    break
-                except:
-                    pass
-        output = handle_nu_range(df)
-        if output.empty:
-            await safe_send(
-                message.channel,
-                content="❌ No valid nu data found."
-            )
-            return
-        # FILTER BY nu VALUE
-        output = output[
-            (output["nu"] >= start_nu) &
-            (output["nu"] <= end_nu)
-        ].copy()
-        if output.empty:
-            await safe_send(
-                message.channel,
-                content="❌ No rows found in that nu range."
-            )
-            return
-        # display columns
-        cols = ["Tank", "Name", "Score", "Id", "nu"]
-        cols = [c for c in cols if c in output.columns]
-        output = output[cols]
-        title = f"NU Leaderboard ({start_nu}-{end_nu})"
-        shorten_tank = True
-        # embed output (same style as your other commands)
-        lines = dataframe_to_markdown_aligned(output, shorten_tank)
-        embed = make_embed(title, lines)
-        footer = f"NU range {start_nu}-{end_nu} • {len(output)} rows"
-        if warning:
-            footer = f"{warning} • {footer}"
-        embed.set_footer(text=footer)
+@ROUTER.command(PREFIX, "n", gt=True, columns=["Ņ", "Score", "Tank", "Date", "Id"])
+async def cmd_name(message, snap, command, mask=None):
+    if len(command.parts) < 3:
         await safe_send(
             message.channel,
-            embed=embed
+            content="❌ Usage: !o;n;PlayerName"
         )
-
-    elif cmd == "cu":
-        await handle_collective_score(message, df, parts)
-        return 
-    
-    elif cmd == "cu15":
-        await handle_cumulative_top10(message, df)
         return
-    
-    elif cmd == "s":
-        if len(parts) < 3:
-            await safe_send(
-                message.channel,
-                content="❌ Usage: !o;s;<Id>"
-            )
-            return
+    name = await fuzzy_or_abort(
+        message=message,
+        snap=snap,
+        column="Name",
+        mask=mask,
+        user_input=command.arg,
+        parts=command.parts,
+        arg_index=2,
+        resolver=handle_name,
+        title="Player not found — did you mean?",
+        result_title="Player Scores",
+        columns=["Ņ", "Tank", "Score", "Date", "Id"]
+    )
+    if name is None:
+        return
+    output = await compute_once(
+        query_key(snap, command, name), handle_name, snap, name,
+        gt_rows(snap, command, mask)
+    )
+    return output, f"All scores of {name}"
 
-        df = read_excel_cached()
-        if isinstance(df, str) or df.empty:
-            await safe_send(message.channel, content="❌ Data unavailable.")
-            return
 
-        df.columns = df.columns.str.strip()
-        screenshot_id = parts[2].strip()
-        await send_screenshot(message.channel, df, screenshot_id)
+@ROUTER.command(PREFIX, "t", gt=True, columns=["Ņ", "Score", "Name", "Date", "Id"])
+async def cmd_tank(message, snap, command, mask=None):
+    tank = await fuzzy_or_abort(
+        message=message,
+        snap=snap,
+        column="Tank",
+        mask=mask,
+        user_input=command.arg,
+        parts=command.parts,
+        arg_index=2,
+        resolver=handle_tank,
+        title="Tank not found — did you mean?",
+        result_title="Tank Scores",
+        columns=["Ņ", "Name", "Score", "date", "Id"]
+    )
+    if tank is None:
         return
+    output = await compute_once(
+        query_key(snap, command, tank), handle_tank, snap, tank,
+        gt_rows(snap, command, mask)
+    )
+    await maybe_send_random_message(message.channel, 0.05)
+    return output, f"All scores of {tank}"
 
-    elif cmd == "d":
-        if len(parts) < 3:
-            await safe_send(
-                message.channel,
-                content="❌ Usage: !o;d;<Id>"
-            )
-            return
-        info_id = parts[2].strip()
-        df = read_excel_cached()
-        if isinstance(df, str) or df.empty:
-            await safe_send(
-                message.channel,
-                content="❌ Data unavailable."
-            )
-            return
-        df.columns = df.columns.str.strip()
-        await send_description_embed(
+
+# No GT addon: the extended board never had a GT column to filter on
+@ROUTER.command(PREFIX, "e", columns=["Ņ", "Score", "Tank", "LB", "Tank LB", "Id"])
+async def cmd_extended(message, snap, command, mask=None):
+    if len(command.parts) < 3:
+        await safe_send(
             message.channel,
-            df,
-            info_id
+            content="❌ Usage: !o;e;PlayerName"
         )
         return
+    name = await fuzzy_or_abort(
+        message=message,
+        snap=snap,
+        column="Name",
+        mask=mask,
+        user_input=command.arg,
+        parts=command.parts,
+        arg_index=2,
+        resolver=handle_name_extended,
+        title="Player not found — did you mean?",
+        result_title="Player Scores",
+        columns=["Ņ", "Score", "Tank", "LB", "Tank LB", "Id"]
+    )
+    if name is None:
+        return
+    output = await compute_once(
+        query_key(snap, command, name), handle_name_extended, snap, name, mask
+    )
+    if output.empty:
+        await safe_send(
+            message.channel,
+            content=f"❌ No scores found for **{name}**."
+        )
+        return
+    # Display order
+    output = output[
+        ["Score", "Tank", "LB", "Tank LB", "Id"]
+    ]
+    # Local row number, same idea as !o;n
+    output.insert(0, "Ņ", range(1, len(output) + 1))
+    return output, f"All scores of {name} — Extended"
 
 
-    elif cmd == "ra":
-        if len(parts) == 2:
-            await safe_send(
-                message.channel,
-                content=(
-                    "!o;ra;0 - 10 random unscored tanks\n"
-                    "!o;ra;1 - 10 random tanks with records from 1Mil-5Mil\n"
-                    "!o;ra;2 - 10 random tanks with records from 5Mil-10Mil\n"
-                    "!o;ra;3 - 10 completely random tanks"
-                )
-            )
-            return
-        try:
-            mode = int(parts[2])
-            if mode not in (0,1,2,3):
-                raise ValueError
-        except:
-            await safe_send(message.channel, content="❌ Invalid mode.")
-            return
-        output = handle_random_analysis(df, mode)
-        output = output.copy()
-        output["Tank"] = output["Tank"].astype(str).str[:14]
-        lines = dataframe_to_markdown_aligned(output, shorten_tank=False)
-        embed = make_embed("Random Recommendations", lines)
-        embed.set_footer(text="🎲 Click the button to reroll")
-        view = RandomAnalysisView(df, mode)
-        msg = await safe_send(message.channel, embed=embed, view=view)
-        view.message = msg
+@ROUTER.command(PREFIX, "w")
+async def cmd_nu(message, snap, command, mask=None):
+    """
+    !o;w;1-15
+    Means:
+    show all rows where nu >= 1 and nu <= 15
+    Max allowed range:
+    20
+    Examples:
+    !o;w;1-15
+    !o;w;40-50
+    !o;w;100-120
+    """
+    if "nu" not in snap.frame.columns:
+        await safe_send(
+            message.channel,
+            content="❌ No 'nu' column found in data."
+        )
+        return
+    # default values
+    start_nu = 1
+    end_nu = 15
+    warning = None
+    # read explicit nu range from command
+    for p in command.parts:
+        if "-" in p:
+            try:
+                a, b = map(int, p.split("-"))
+                if a > b:
+                    a, b = b, a
+                # MAX RANGE = 20
+                if (b - a) > 20:
+                    warning = "❌ Max NU range is 20!"
+                    b = a + 20
+                start_nu = a
+                end_nu = b
+                break
+            except:
+                pass
+    if not len(snap.nu_values):
+        await safe_send(
+            message.channel,
+            content="❌ No valid nu data found."
+        )
         return
+    # Only the rows inside the nu range are touched
+    key = query_key(snap, command, start_nu, end_nu)
+    output = await compute_once(key, handle_nu_range, snap, start_nu, end_nu, mask)
+    if output.empty:
+        await safe_send(
+            message.channel,
+            content="❌ No rows found in that nu range."
+        )
+        return
+    # display columns
+    cols = ["Tank", "Name", "Score", "Id", "nu"]
+    cols = [c for c in cols if c in output.columns]
+    output = output[cols]
+    title = f"NU Leaderboard ({start_nu}-{end_nu})"
+    shorten_tank = True
+    # embed output (same style as your other commands)
+    lines = await compute_once(
+        key + ("table",), dataframe_to_markdown_aligned, output, shorten_tank, snap
+    )
+    embed = make_embed(title, lines)
+    footer = f"NU range {start_nu}-{end_nu} • {len(output)} rows"
+    if warning:
+        footer = f"{warning} • {footer}"
+    embed.set_footer(text=footer)
+    await safe_send(
+        message.channel,
+        embed=embed
+    )
 
-    
 
+# ---------------- !o; everything else ----------------
 
+@ROUTER.command(PREFIX, "nt")
+async def cmd_name_tank(message, snap, command, mask=None):
+    await handle_name_tank(message, snap, command.parts, mask, query_key(snap, command))
 
-    elif cmd == "i":
-        if len(parts) < 3:
-            await safe_send(
-                message.channel,
-                content="❌ Usage: !o;i;<Id>"
-            )
-            return
-        info_id = parts[2].strip()
-        df = read_excel_cached()
-        if isinstance(df, str) or df.empty:
-            await safe_send(message.channel, content="❌ Data unavailable.")
-            return
-        df.columns = df.columns.str.strip()
-        await send_info_embed(message.channel, df, info_id)
-        return   
 
-    
-    elif cmd == "re":
-        await handle_records_player(message, df, parts)
-        return
+@ROUTER.command(PREFIX, "cu")
+async def cmd_collective(message, snap, command, mask=None):
+    await handle_collective_score(message, snap, command.parts, mask, query_key(snap, command))
 
-    
-    # --- Call in on_message ---
-    elif cmd == "bch":
-        if len(parts) < 3:
-            await safe_send(message.channel, content="❌ Usage: !o;bch;<branchname>")
-            return
-        branch_name = parts[2].strip()
-        await handle_branch_command(message, branch_name)
+
+@ROUTER.command(PREFIX, "cu15", warm=True)
+async def cmd_cumulative(message, snap, command, mask=None):
+    await handle_cumulative_top10(message, snap, mask)
+
+
+@ROUTER.command(PREFIX, "re")
+async def cmd_records(message, snap, command, mask=None):
+    await handle_records_player(message, snap, command.parts, mask, query_key(snap, command))
+
+
+@ROUTER.command(PREFIX, "bch")
+async def cmd_branch(message, snap, command, mask=None):
+    if len(command.parts) < 3:
+        await safe_send(message.channel, content="❌ Usage: !o;bch;<branchname>")
         return
+    await handle_branch_command(message, command.arg, parts=command.parts)
 
-    
-        # --- HELP ---
-    elif cmd == "help":
-        help_message = (
-                "Commands:\n"
-                "!o;p              - Part of the scoreboard\n"            
-                "!o;t;TankName     - Best score of a tank\n"
-                "!o;n;Player       - Best scores of a player\n"
-                "!o;re;Player       - Records of a player\n"              
-                "!o;bch;BranchName    - Every tank in a branch\n"
-
-                "!o;ra             - Random recommendation\n"            
-                "!o;i;id              - Score info\n"
-            )
-        await safe_send(message.channel, content=help_message)
+
+# command -> (usage, sender(channel, snap, id))
+ID_COMMANDS = {
+    "s": ("❌ Usage: !o;s;<Id>", send_screenshot),
+    "d": ("❌ Usage: !o;d;<Id>", send_description_embed),
+    "i": ("❌ Usage: !o;i;<Id>", send_info_embed),
+}
+
+
+@ROUTER.command(PREFIX, *ID_COMMANDS)
+async def cmd_by_id(message, snap, command, mask=None):
+    usage, sender = ID_COMMANDS[command.name]
+    if len(command.parts) < 3:
+        await safe_send(message.channel, content=usage)
         return
+    await sender(message.channel, snap, command.arg)
+
 
-    elif cmd == "help2":
-        help_message = (
-                "Commands:\n"
-                "!o;nt;Player;Tank     - Player and Tank       \n"            
-                "!o;c             - Best tank list\n"
-                "!o;b              - Best player list\n"
-                "!o;w;1-15         - See new added\n"
-                "!o;say;             - For an rng text\n"
-                "!o;s;id                 - Screenshot of the score\n"
-                "!o;r                    - Random recommendation\n" 
-                "(add at the end of a command vvv)\n" 
-                ";1-15    -to imput range\n" 
-                ";r    -to see regular scores\n" 
-                ";YYYY-MM-DD    -date \n" 
-                "!o;e;Player       - Player scores with global + tank leaderboard ranks\n"                "x!Something         - Find a player or tank automatically\n"                
+@ROUTER.command(PREFIX, "ra")
+async def cmd_random_analysis(message, snap, command, mask=None):
+    parts = command.parts
+    if len(parts) == 2:
+        await safe_send(
+            message.channel,
+            content=(
+                "!o;ra;0 - 10 random unscored tanks\n"
+                "!o;ra;1 - 10 random tanks with records from 1Mil-5Mil\n"
+                "!o;ra;2 - 10 random tanks with records from 5Mil-10Mil\n"
+                "!o;ra;3 - 10 completely random tanks"
             )
-        await safe_send(message.channel, content=help_message)
+        )
         return
+    try:
+        mode = int(parts[2])
+        if mode not in (0,1,2,3):
+            raise ValueError
+    except:
+        await safe_send(message.channel, content="❌ Invalid mode.")
+        return
+    lines = await run_compute(random_analysis_lines, snap, mode, mask)
+    embed = make_embed("Random Recommendations", lines)
+    embed.set_footer(text="🎲 Click the button to reroll")
+    view = RandomAnalysisView(snap, mode, mask)
+    msg = await safe_send(message.channel, embed=embed, view=view)
+    view.message = msg
 
 
-    elif cmd == "r":
-        if len(parts) == 2:
-            await safe_send(
-                message.channel,
-                content=(
-                    "**!o;r;a** for a tank with a player record!\n"
-                    "**!o;r;b** for the tank with no score!\n"
-                    "**!o;r;r** for a fully random tank!"
-                )
+@ROUTER.command(PREFIX, "r")
+async def cmd_recommend(message, snap, command, mask=None):
+    parts = command.parts
+    if len(parts) == 2:
+        await safe_send(
+            message.channel,
+            content=(
+                "**!o;r;a** for a tank with a player record!\n"
+                "**!o;r;b** for the tank with no score!\n"
+                "**!o;r;r** for a fully random tank!"
             )
+        )
+        return
+    df = snap.frame if mask is None else snap.frame[mask]
+    sub = parts[2].lower()
+    if sub == "a":
+        row = df.sample(1).iloc[0]
+        await safe_send(message.channel, content=f"{row['Name in game']} recommends {row['Tank']}")
+        return
+    if sub == "b":
+        used = set(df["tank_key"])
+        unused = [t for t in TANK_NAMES if t.lower() not in used]
+        if not unused:
+            await safe_send(message.channel, content="No tanks left.")
             return
-        sub = parts[2].lower()
-        if sub == "a":
-            row = df.sample(1).iloc[0]
-            await safe_send(message.channel, content=f"{row['Name in game']} recommends {row['Tank']}")
-            return
-        if sub == "b":
-            used = set(df["Tank"].str.lower())
-            unused = [t for t in TANK_NAMES if t.lower() not in used]
-            if not unused:
-                await safe_send(message.channel, content="No tanks left.")
-                return
-            await safe_send(message.channel, content=f"Mountain recommends {random.choice(unused)}")
-            return
-            
-        if sub == "r":
-            await safe_send(message.channel, content=f"Siege Emperor recommends {random.choice(TANK_NAMES)}")           
-            return
-        await safe_send(message.channel, content="Unknown r command.")
+        await safe_send(message.channel, content=f"Mountain recommends {random.choice(unused)}")
         return
 
-    else:
+    if sub == "r":
+        await safe_send(message.channel, content=f"Siege Emperor recommends {random.choice(TANK_NAMES)}")
         return
+    await safe_send(message.channel, content="Unknown r command.")
 
-    if output is None or output.empty:
-        await safe_send(message.channel, content="No results.")
-        await bot.process_commands(message)
-        return
 
+@ROUTER.command(PREFIX, "say")
+async def cmd_say(message, snap, command, mask=None):
+    msgs = load_messages()
+    if not msgs:
+        await safe_send(message.channel, content="❌ No messages loaded.")
+        return
 
-    # ---------------- GT FILTER HERE ----------------
-    gt_filter = extract_gt(parts)
-    if gt_filter and "GT" in output.columns:
-        output = output[
-            output["GT"].astype(str).str.upper() == gt_filter
-        ]
-    if output.empty:
-        await safe_send(
-            message.channel,
-            content=f"No results for GT={gt_filter}."
-        )
+    await message.delete()
+    await safe_send(message.channel, content=random.choice(msgs))
+
+
+HELP_TEXT = {
+    "help": (
+        "Commands:\n"
+        "!o;p              - Part of the scoreboard\n"
+        "!o;t;TankName     - Best score of a tank\n"
+        "!o;n;Player       - Best scores of a player\n"
+        "!o;re;Player       - Records of a player\n"
+        "!o;bch;BranchName    - Every tank in a branch\n"
+
+        "!o;ra             - Random recommendation\n"
+        "!o;i;id              - Score info\n"
+    ),
+    "help2": (
+        "Commands:\n"
+        "!o;nt;Player;Tank     - Player and Tank       \n"
+        "!o;c             - Best tank list\n"
+        "!o;b              - Best player list\n"
+        "!o;w;1-15         - See new added\n"
+        "!o;say;             - For an rng text\n"
+        "!o;s;id                 - Screenshot of the score\n"
+        "!o;r                    - Random recommendation\n"
+        "(add at the end of a command vvv)\n"
+        ";1-15    -to imput range\n"
+        ";r    -to see regular scores\n"
+        ";YYYY-MM-DD    -date \n"
+        "!o;e;Player       - Player scores with global + tank leaderboard ranks\n"                "x!Something         - Find a player or tank automatically\n"
+    ),
+}
+
+
+@ROUTER.command(PREFIX, *HELP_TEXT)
+async def cmd_help(message, snap, command, mask=None):
+    await safe_send(message.channel, content=HELP_TEXT[command.name])
+
+
+# ---------------- owner ----------------
+
+@ROUTER.command(PREFIX, "reload", owner=True)
+async def cmd_reload(message, snap, command, mask=None):
+    snap = await reload_snapshot()
+    if snap is None:
+        await safe_send(message.channel, content="❌ Reload failed, still on the old data.")
         return
-    # ------------------------------------------------
-
-    if cmd == "n":  # player
-        cols = ["Ņ", "Score", "Tank", "Date", "Id"]
-    elif cmd == "t":  # tank
-        cols = ["Ņ", "Score", "Name", "Date", "Id"]
-    elif cmd == "e":  # extended player
-        cols = ["Ņ", "Score", "Tank", "LB", "Tank LB", "Id"]    
-    elif cmd == "c":
-        cols = COLUMNS_C.copy()
-    else:
-        cols = COLUMNS_DEFAULT.copy()
-    cols = [c for c in cols if c in output.columns]
-    output = output[cols]
+    await safe_send(
+        message.channel,
+        content=(
+            f"Reloaded v{snap.version} ({snap.source}) "
+            f"in {snap.build_seconds:.2f}s • {len(snap.frame)} rows"
+        )
+    )
 
 
-    # after output is finalized
-    if 'title' not in locals() or title is None:
-        title_map = {
-            "a": "All Scores",
-            "b": "Best Players",
-            "c": "Best Per Tank",
-            "p": "Leaderboard"
-        }
-        title = title_map.get(cmd, "Olymp Leaderboard")
+@ROUTER.command(PREFIX, "stats", owner=True)
+async def cmd_stats(message, snap, command, mask=None):
+    await safe_send(message.channel, content="\n".join(bot_stats_lines()))
 
-    start, end, range_size, warning = extract_range(parts, max_range=20, total_len=len(output))
 
+@bot.event
+async def on_message(message):
+    await process_olympus_command(message)
 
-    view = RangePaginationView(
-        df=output,
-        start_index=start,
-        range_size=range_size,
-        title=title,
-        shorten_tank=shorten_tank
-    )
-    slice_df = output.iloc[start-1:end]
-    slice_df["Ņ"] = range(start, min(end, len(output)) + 1)
-    lines = dataframe_to_markdown_aligned(slice_df, shorten_tank)
-    embed = make_embed(title, lines)
-    footer = f"Rows {start}-{min(end, len(output))} / {len(output)}"
-    if warning:
-        footer = f"{warning} • {footer}"
 
-    embed.set_footer(text=footer)
+# ---------------- autocomplete ----------------
+# Answered from the snapshot's sorted key arrays, no DataFrame work,
+# so it stays well inside Discord's 3 second autocomplete window.
+def autocomplete_choices(completer_name, current):
+    snap = CURRENT_SNAPSHOT
+    if snap is None:
+        return []
+    completer = getattr(snap.vocab, completer_name)
+    return [
+        app_commands.Choice(name=label, value=value)
+        for label, value in completer.complete(current)
+    ]
 
 
-    msg = await safe_send(message.channel, embed=embed, view=view)
-    view.message = msg
-    await bot.process_commands(message) 
-    
+async def player_autocomplete(interaction: discord.Interaction, current: str):
+    return autocomplete_choices("player_complete", current)
 
 
+async def tank_autocomplete(interaction: discord.Interaction, current: str):
+    return autocomplete_choices("tank_complete", current)
 
-    # -------------!o;p;1-10------------------------
 
-@bot.event
-async def on_message(message):
-    await process_olympus_command(message)
+async def branch_autocomplete(interaction: discord.Interaction, current: str):
+    return autocomplete_choices("branch_complete", current)
+
+
+async def id_autocomplete(interaction: discord.Interaction, current: str):
+    return autocomplete_choices("id_complete", current)
 
 
 @bot.tree.command(name="leaderboard", description="Leaderboard with optional filters")
@@ -2487,51 +2535,82 @@ async def on_message(message):
     start="Starting rank (default: 1)",
     end="Ending rank (default: 15)",
     gt="GT filter (A, R, F, L)",
-    date="Date filter. Example: 2024-01-01 or >2024-01-01"
+    date="Date filter. Example: 2024-01-01 or >2024-01-01",
+    player="Only this player's scores",
+    tank="Only this tank's scores"
 )
+@app_commands.autocomplete(player=player_autocomplete, tank=tank_autocomplete)
 async def leaderboard_EXPERIMENTAL(
     interaction: discord.Interaction,
     start: int = 1,
     end: int = 15,
     gt: str | None = None,
-    date: str | None = None
+    date: str | None = None,
+    player: str | None = None,
+    tank: str | None = None
 ):
     await interaction.response.defer()
-    df = read_excel_cached()
-    if isinstance(df, str) or df.empty:
-        await interaction.followup.send("Data unavailable.")
+    snap = await get_snapshot()
+    if snap is None or snap.frame.empty:
+        await safe_reply(interaction, interaction.followup.send, content="Data unavailable.")
         return
-    df.columns = df.columns.str.strip()
+    title = "Leaderboard"
+
+    # Unfiltered first page is the same table as !o;p, pre-rendered
+    if start == 1 and end == 15 and not (gt or date or player or tank):
+        page = warm_page(snap, "p")
+        if page is not None:
+            embed, view = warm_page_message(snap, page)
+            msg = await safe_reply(interaction, interaction.followup.send, embed=embed, view=view)
+            view.message = msg
+            return
+    WARM_STATS["live"] += 1
 
     # ---------------- DATE FILTER ----------------
+    row_mask = None
     if date:
-
-        date_pattern = re.compile(r'([<>=]?)(\d{4}-\d{2}-\d{2})')
-        match = date_pattern.fullmatch(date.strip())
-        if not match:
-            await interaction.followup.send("Invalid date format.")
+        date_filter = parse_date_filter(date)
+        if not date_filter:
+            await safe_reply(interaction, interaction.followup.send, content="Invalid date format.")
             return
-        operator, date_target = match.groups()
-        df["Date"] = df["Date"].astype(str).str[:10]
-        if operator == "<":
-            df = df[df["Date"] < date_target]
-        elif operator == ">":
-            df = df[df["Date"] > date_target]
-        else:
-            df = df[df["Date"] == date_target]
-        if df.empty:
-            await interaction.followup.send("No results for that date filter.")
+        row_mask = snap.date_mask(*date_filter)
+        if not row_mask.any():
+            await safe_reply(interaction, interaction.followup.send, content="No results for that date filter.")
             return
-    # ---------------- NORMALIZE & SORT ----------------
-    df = normalize_score(df).sort_values("Score", ascending=False)
 
     # ---------------- GT FILTER ----------------
-    if gt and "GT" in df.columns:
-        df = df[df["GT"].astype(str).str.upper() == gt.upper()]
-        if df.empty:
-            await interaction.followup.send(f"No results for GT={gt.upper()}")
+    if gt and "GT" in snap.frame.columns:
+        row_mask = combine_masks(row_mask, snap.gt_mask(gt))
+        if not row_mask.any():
+            await safe_reply(interaction, interaction.followup.send, content=f"No results for GT={gt.upper()}")
             return
-    df = add_index(df)
+
+    # ---------------- PLAYER / TANK FILTER ----------------
+    if player:
+        name = snap.vocab.closest("Name", player)
+        if name is None:
+            await safe_reply(interaction, interaction.followup.send, content=f"Player `{player}` not found.")
+            return
+        positions = snap.player_rows.get(name.lower(), NO_ROWS)
+        row_mask = combine_masks(row_mask, snap.positions_mask(positions))
+        title = f"{title} — {name}"
+    if tank:
+        tank_name = snap.vocab.closest("Tank", tank)
+        if tank_name is None:
+            await safe_reply(interaction, interaction.followup.send, content=f"Tank `{tank}` not found.")
+            return
+        positions = snap.tank_rows.get(tank_name.lower(), NO_ROWS)
+        row_mask = combine_masks(row_mask, snap.positions_mask(positions))
+        title = f"{title} — {tank_name}"
+    if row_mask is not None and not row_mask.any():
+        await safe_reply(interaction, interaction.followup.send, content="No results for those filters.")
+        return
+
+    # ---------------- SORT ----------------
+    # Only rows passing every mask are gathered, already in Score order
+    df = await run_compute(
+        lambda: add_index(snap.rows(snap.ordered(row_mask)))[["Ņ", "Score", "Name", "Tank", "Id"]]
+    )
 
     # ---------------- RANGE LOGIC ----------------
     if start < 1:
@@ -2539,27 +2618,31 @@ async def leaderboard_EXPERIMENTAL(
     if end < start:
         end = start
     total_len = len(df)
+    if start > total_len:
+        # Past the last row (player/tank filters leave few): same size, ending there
+        start, end = max(total_len - (end - start), 1), total_len
     end = min(end, total_len)
     range_size = end - start + 1
 
     # ---------------- PAGINATION VIEW ----------------
     view = RangePaginationView(
-        df=df[["Ņ", "Score", "Name", "Tank", "Id"]],
+        df=df,
         start_index=start,
         range_size=range_size,
-        title="Leaderboard",
-        shorten_tank=True
+        title=title,
+        shorten_tank=True,
+        snap=snap
     )
-    slice_df = df.iloc[start-1:end].copy()
+    slice_df = df.iloc[start-1:end]
     slice_df["Ņ"] = range(start, end + 1)
-    lines = dataframe_to_markdown_aligned(slice_df)
+    lines = await run_compute(dataframe_to_markdown_aligned, slice_df, snap=snap)
     embed = discord.Embed(
-        title="Leaderboard",
+        title=title,
         description=f"```text\n{chr(10).join(lines)}\n```",
         color=discord.Color.red()
     )
     embed.set_footer(text=f"Rows {start}-{end} / {total_len}")
-    msg = await interaction.followup.send(embed=embed, view=view)
+    msg = await safe_reply(interaction, interaction.followup.send, embed=embed, view=view)
     view.message = msg
 
 
@@ -2569,17 +2652,40 @@ async def leaderboard_EXPERIMENTAL(
 # ---------------- i command ----------------
 @bot.tree.command(name="info", description="Detailed score information by ID")
 @app_commands.describe(id="Score ID, for example Qr")
+@app_commands.autocomplete(id=id_autocomplete)
 async def info(interaction: discord.Interaction, id: str):
     await interaction.response.defer()
-    df = read_excel_cached()
-    if isinstance(df, str) or df.empty:
-        await interaction.edit_original_response(
+    snap = await get_snapshot()
+    if snap is None or snap.frame.empty:
+        await safe_reply(
+            interaction, interaction.edit_original_response,
             content="❌ Data unavailable. Or is it?"
         )
         return
-    df.columns = df.columns.str.strip()
     # Reuse existing function — but pass interaction
-    await send_info_embed(interaction.channel, df, id, interaction=interaction)
+    await send_info_embed(interaction.channel, snap, id, interaction=interaction)
+
+
+# ---------------- bch command ----------------
+@bot.tree.command(name="branch", description="Best score of every tank in a branch")
+@app_commands.describe(branch="Branch name, for example Twin")
+@app_commands.autocomplete(branch=branch_autocomplete)
+async def branch(interaction: discord.Interaction, branch: str):
+    await interaction.response.defer()
+    snap = await get_snapshot()
+    if snap is None:
+        await safe_reply(interaction, interaction.edit_original_response, content="❌ Data unavailable.")
+        return
+    # Typos get the closest branch here; the "did you mean" buttons
+    # are built for prefix commands
+    branch_key = snap.vocab.closest("Branch", branch, cutoff=0.6)
+    if branch_key is None:
+        await safe_reply(
+            interaction, interaction.edit_original_response,
+            content=f"❌ Branch `{branch}` not found."
+        )
+        return
+    await handle_branch_command(None, branch_key, interaction=interaction)
 
 
 
@@ -0,0 +1,381 @@
+# outbound.py
+import asyncio
+import itertools
+import re
+import time
+from collections import deque
+import aiohttp
+from discord.errors import HTTPException, RateLimited
+
+# Lower goes first
+INTERACTION, SEND, EDIT = 0, 1, 2
+
+CHANNEL_URL_RE = re.compile(r"/channels/(\d+)/messages(/\d+)?")
+# Interaction callbacks and followups / original-response edits, by token
+WEBHOOK_URL_RE = re.compile(r"/(?:interactions/\d+|webhooks/\d+)/([^/?]+)")
+# Discord: 50 requests/s for the whole bot, 5 messages / 5 s per channel
+GLOBAL_LIMIT = (50, 1.0)
+CHANNEL_LIMIT = (5, 5.0)
+CLOUDFLARE_BACKOFF = 60.0
+
+
+class TokenBucket:
+    """
+    `limit` requests per `per` seconds, refilled all at once when the
+    window resets, like Discord's buckets. Starts from a guess and follows
+    the X-RateLimit-* headers once a response for it has been seen.
+    """
+
+    def __init__(self, limit, per, clock=time.monotonic):
+        self.limit = limit
+        self.per = per
+        self.clock = clock
+        self.remaining = limit
+        self.reset_at = 0.0
+        self.blocked_until = 0.0
+
+    def delay(self):
+        """Seconds until a request may go out, 0 when one can now."""
+        now = self.clock()
+        if self.blocked_until > now:
+            return self.blocked_until - now
+        if self.reset_at > now and self.remaining <= 0:
+            return self.reset_at - now
+        return 0.0
+
+    def take(self):
+        now = self.clock()
+        if self.reset_at <= now:
+            self.remaining = self.limit
+            self.reset_at = now + self.per
+        self.remaining -= 1
+
+    def block(self, seconds):
+        self.blocked_until = max(self.blocked_until, self.clock() + seconds)
+
+    def update(self, headers):
+        """Follow Discord's X-RateLimit-Limit / -Remaining / -Reset-After."""
+        try:
+            limit = int(headers["X-RateLimit-Limit"])
+            remaining = int(headers["X-RateLimit-Remaining"])
+            reset_after = float(headers["X-RateLimit-Reset-After"])
+        except (KeyError, ValueError):
+            return
+        # One request per bucket is in flight, so these are current
+        self.limit = limit
+        self.remaining = remaining
+        self.reset_at = self.clock() + reset_after
+
+
+def retry_after(error):
+    """Seconds Discord asked us to wait, from a 429 HTTPException."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    for name in ("X-RateLimit-Reset-After", "Retry-After"):
+        try:
+            return float(headers[name])
+        except (KeyError, ValueError):
+            continue
+    return 5.0
+
+
+def is_cloudflare(error):
+    # Cloudflare answers with an HTML page instead of Discord's JSON
+    text = getattr(error, "text", "") or ""
+    return "DOCTYPE html" in text or "<html" in text.lower()
+
+
+def url_bucket(method, url):
+    """Scheduler bucket key for a Discord REST call, None if it isn't one of ours."""
+    match = CHANNEL_URL_RE.search(url)
+    if match is not None:
+        channel = int(match.group(1))
+        if method == "POST" and not match.group(2):
+            return ("channel", channel)
+        if method == "PATCH" and match.group(2):
+            return ("edit", channel)
+        return None
+    match = WEBHOOK_URL_RE.search(url)
+    if match is not None:
+        return ("interaction", match.group(1))
+    return None
+
+
+def _copy_result(source, target):
+    if target.done():
+        return
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+class Job:
+    __slots__ = (
+        "priority", "seq", "bucket", "call", "kwargs", "merge_key",
+        "future", "queued_at", "attempts"
+    )
+
+    def __init__(self, priority, seq, bucket, call, kwargs, merge_key, future, queued_at):
+        self.priority = priority
+        self.seq = seq
+        self.bucket = bucket
+        self.call = call
+        self.kwargs = kwargs
+        self.merge_key = merge_key
+        self.future = future
+        self.queued_at = queued_at
+        self.attempts = 0
+
+
+class SendScheduler:
+    """
+    Every outgoing send / edit / interaction reply goes through here.
+
+    Jobs wait in one queue, interaction replies first, then sends, then
+    edits. A job goes out when its bucket (sends per channel, edits per
+    channel, replies per interaction token) and the global bucket allow
+    it; one request per bucket is in flight at a time so a channel keeps
+    its order. Buckets follow the rate-limit headers of every response.
+    A queued edit of a message that gets edited again is merged into the
+    newer one. 429s re-queue the job instead of sleeping in the caller;
+    a Cloudflare block pauses everything for cloudflare_backoff seconds.
+    """
+
+    def __init__(self, max_attempts=4, max_wait=30.0, global_limit=GLOBAL_LIMIT,
+                 channel_limit=CHANNEL_LIMIT, cloudflare_backoff=CLOUDFLARE_BACKOFF,
+                 clock=time.monotonic):
+        self.max_attempts = max_attempts
+        self.max_wait = max_wait
+        self.cloudflare_backoff = cloudflare_backoff
+        self.channel_limit = channel_limit
+        self.clock = clock
+        self.global_bucket = TokenBucket(*global_limit, clock=clock)
+        self.buckets = {}
+        self.seq = itertools.count()
+        self.waits = deque(maxlen=1000)
+        self.counts = {
+            "sent": 0, "merged": 0, "retried": 0, "dropped": 0,
+            "rate_limited": 0, "cloudflare": 0, "max_depth": 0
+        }
+        self._reset()
+
+    def _reset(self):
+        self.queue = []
+        self.pending_edits = {}
+        self.busy = set()
+        self.loop = None
+        self.wake = None
+        self.task = None
+
+    # ---------- submitting ----------
+
+    async def send(self, channel, **kwargs):
+        """channel.send(**kwargs), rate-limited. None if it never went out."""
+        bucket = ("channel", getattr(channel, "id", None) or id(channel))
+        return await self.submit(SEND, bucket, channel.send, kwargs)
+
+    async def edit(self, message, **kwargs):
+        """message.edit(**kwargs); a newer edit of the same message replaces it."""
+        # Discord limits edits per channel, not per message
+        channel = getattr(message, "channel", None)
+        bucket = ("edit", getattr(channel, "id", None) or id(message))
+        key = ("message", getattr(message, "id", None) or id(message))
+        return await self.submit(EDIT, bucket, message.edit, kwargs, merge_key=key)
+
+    async def interaction(self, interaction, call, **kwargs):
+        """call(**kwargs) for an interaction reply, ahead of everything else."""
+        # The token is what the callback and webhook URLs carry
+        token = getattr(interaction, "token", None) or getattr(interaction, "id", None)
+        bucket = ("interaction", token or id(interaction))
+        return await self.submit(INTERACTION, bucket, call, kwargs)
+
+    async def submit(self, priority, bucket, call, kwargs, merge_key=None):
+        self._ensure_running()
+        if merge_key is not None:
+            pending = self.pending_edits.get(merge_key)
+            if pending is not None:
+                # Stale edit: fold the newer arguments into the queued one
+                pending.kwargs.update(kwargs)
+                self.counts["merged"] += 1
+                return await asyncio.shield(pending.future)
+        job = Job(
+            priority, next(self.seq), bucket, call, kwargs, merge_key,
+            self.loop.create_future(), self.clock()
+        )
+        if merge_key is not None:
+            self.pending_edits[merge_key] = job
+        self.queue.append(job)
+        self.counts["max_depth"] = max(self.counts["max_depth"], len(self.queue))
+        self.wake.set()
+        return await asyncio.shield(job.future)
+
+    # ---------- dispatching ----------
+
+    def _ensure_running(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            # New event loop (tests, restarts): old jobs died with the old one
+            self._reset()
+            self.loop = loop
+            self.wake = asyncio.Event()
+        if self.task is None or self.task.done():
+            self.task = loop.create_task(self._dispatch())
+
+    def bucket(self, key):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            if len(self.buckets) > 10_000:
+                self._prune_buckets()
+            bucket = self.buckets[key] = TokenBucket(*self.channel_limit, clock=self.clock)
+        return bucket
+
+    def _prune_buckets(self):
+        # Every interaction gets a bucket; forget idle ones
+        now = self.clock()
+        for key in [
+            k for k, b in self.buckets.items()
+            if k not in self.busy and b.reset_at <= now and b.blocked_until <= now
+        ]:
+            del self.buckets[key]
+
+    def _next_job(self):
+        """(job ready to go or None, seconds until something might be)."""
+        best = None
+        soonest = None
+        now = self.clock()
+        global_delay = self.global_bucket.delay()
+        for job in list(self.queue):
+            left = job.queued_at + self.max_wait - now
+            if left <= 0:
+                # Too late to be worth sending (long 429, Cloudflare pause)
+                self._give_up(job)
+                continue
+            if job.bucket in self.busy:
+                continue
+            delay = self.bucket(job.bucket).delay()
+            # Interaction replies aren't under the global limit
+            if job.priority != INTERACTION:
+                delay = max(delay, global_delay)
+            if delay > 0:
+                delay = min(delay, left)
+                soonest = delay if soonest is None else min(soonest, delay)
+            elif best is None or (job.priority, job.seq) < (best.priority, best.seq):
+                best = job
+        return best, soonest
+
+    def _give_up(self, job):
+        print(f"Gave up sending after {job.attempts} tries ({self.clock() - job.queued_at:.1f}s)")
+        self.counts["dropped"] += 1
+        if job in self.queue:
+            self.queue.remove(job)
+        if job.merge_key is not None and self.pending_edits.get(job.merge_key) is job:
+            del self.pending_edits[job.merge_key]
+        job.future.set_result(None)
+
+    async def _dispatch(self):
+        while True:
+            job, soonest = self._next_job()
+            if job is None:
+                self.wake.clear()
+                try:
+                    await asyncio.wait_for(self.wake.wait(), soonest)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self.queue.remove(job)
+            if job.merge_key is not None:
+                self.pending_edits.pop(job.merge_key, None)
+            self.bucket(job.bucket).take()
+            if job.priority != INTERACTION:
+                self.global_bucket.take()
+            self.busy.add(job.bucket)
+            self.loop.create_task(self._execute(job))
+
+    async def _execute(self, job):
+        try:
+            self.waits.append(self.clock() - job.queued_at)
+            result = await job.call(**job.kwargs)
+        except RateLimited as e:
+            self._retry(job, e.retry_after, global_=False)
+        except HTTPException as e:
+            if e.status != 429:
+                job.future.set_exception(e)
+            elif is_cloudflare(e):
+                print("Blocked by Cloudflare, pausing sends.")
+                self.counts["cloudflare"] += 1
+                self._retry(job, self.cloudflare_backoff, global_=True)
+            else:
+                headers = getattr(e.response, "headers", None) or {}
+                global_ = headers.get("X-RateLimit-Global") == "true" or \
+                    headers.get("X-RateLimit-Scope") == "global"
+                self._retry(job, retry_after(e), global_)
+        except Exception as e:
+            job.future.set_exception(e)
+        else:
+            self.counts["sent"] += 1
+            job.future.set_result(result)
+        finally:
+            self.busy.discard(job.bucket)
+            self.wake.set()
+
+    def _retry(self, job, wait, global_):
+        self.counts["rate_limited"] += 1
+        (self.global_bucket if global_ else self.bucket(job.bucket)).block(wait)
+        job.attempts += 1
+        waited = self.clock() - job.queued_at
+        if job.attempts >= self.max_attempts or waited + wait > self.max_wait:
+            self._give_up(job)
+            return
+        print(f"Rate limited — retrying in {wait:.2f}s")
+        self.counts["retried"] += 1
+        newer = self.pending_edits.get(job.merge_key) if job.merge_key else None
+        if newer is not None:
+            # A newer edit of the message is queued: send that one only
+            newer.kwargs = {**job.kwargs, **newer.kwargs}
+            newer.future.add_done_callback(lambda f: _copy_result(f, job.future))
+            self.counts["merged"] += 1
+            return
+        # Same seq: it keeps its place ahead of later jobs
+        self.queue.append(job)
+        if job.merge_key is not None:
+            self.pending_edits[job.merge_key] = job
+
+    # ---------- headers ----------
+
+    def observe(self, method, url, status, headers):
+        """Feed a response's rate-limit headers into the matching bucket."""
+        if status == 429:
+            return
+        key = url_bucket(method, url)
+        if key is not None:
+            self.bucket(key).update(headers)
+
+    def trace_config(self):
+        """aiohttp TraceConfig that reports every Discord response to observe()."""
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_end(session, context, params):
+            self.observe(
+                params.method, str(params.url),
+                params.response.status, params.response.headers
+            )
+
+        trace.on_request_end.append(on_request_end)
+        return trace
+
+    # ---------- stats ----------
+
+    def stats(self):
+        waits = sorted(self.waits)
+        p50 = waits[len(waits) // 2] if waits else 0.0
+        p95 = waits[int(len(waits) * 0.95)] if waits else 0.0
+        return dict(
+            self.counts,
+            depth=len(self.queue),
+            in_flight=len(self.busy),
+            wait_p50=p50,
+            wait_p95=p95,
+            wait_max=waits[-1] if waits else 0.0
+        )
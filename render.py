@@ -0,0 +1,126 @@
+# render.py
+import re
+import numpy as np
+import pandas as pd
+from wcwidth import wcswidth
+
+FIRST_COLUMN = "Score"
+TANK_ABBREVIATIONS = (("triple", "t"), ("auto", "a"), ("hexa", "h"))
+# Columns the snapshot keeps pre-formatted, one string + width per row
+DISPLAY_COLUMNS = (FIRST_COLUMN, "Date", "Name", "Tank", "Id", "LB", "Tank LB", "nu")
+_WIDTHS = {}
+_TANK_LABELS = {}
+
+
+def shorten_name(name: str, max_len: int = 10) -> str:
+    name = str(name).strip()
+    if len(name) > max_len:
+        name = name[:max_len]
+    return name
+
+
+def display_width(text):
+    """wcswidth(text), with plain ASCII answered by len()."""
+    if text.isascii() and text.isprintable():
+        return len(text)
+    width = _WIDTHS.get(text)
+    if width is None:
+        if len(_WIDTHS) > 10_000:
+            _WIDTHS.clear()
+        width = _WIDTHS[text] = wcswidth(text)
+    return width
+
+
+def short_tank_label(tank):
+    """'Triple Auto-Pen' -> 'T A-Pen', 8 characters at most."""
+    # Missing tanks stay "nan", as pandas' string methods leave them
+    if pd.isna(tank):
+        return "nan"
+    label = _TANK_LABELS.get(tank)
+    if label is None:
+        label = str(tank).lower()
+        for pattern, short in TANK_ABBREVIATIONS:
+            label = re.sub(pattern, short, label)
+        label = label.title()[:8]
+        if len(_TANK_LABELS) > 10_000:
+            _TANK_LABELS.clear()
+        _TANK_LABELS[tank] = label
+    return label
+
+
+def format_column(series, column, shorten_tank):
+    """Cell strings for one column, as they appear in the table."""
+    if column == FIRST_COLUMN:
+        return [
+            f"{v / 1_000_000:,.3f} M"
+            for v in series.to_numpy(dtype=float).tolist()
+        ]
+    if column == "Date":
+        if pd.api.types.is_datetime64_any_dtype(series):
+            days = np.datetime_as_string(series.to_numpy("datetime64[D]"), unit="D")
+            return ["???" if d == "NaT" else d for d in days.tolist()]
+        return [str(v)[:10] for v in series.tolist()]
+    if column == "Name":
+        return [shorten_name(v, 10) for v in series.tolist()]
+    if column == "Tank" and shorten_tank:
+        return [short_tank_label(v) for v in series.tolist()]
+    return [str(v) for v in series.tolist()]
+
+
+def display_columns(frame):
+    """
+    column -> (cell strings, display widths), one entry per frame row,
+    for the DISPLAY_COLUMNS in `frame`. Tank is the shortened form.
+    """
+    out = {}
+    for column in DISPLAY_COLUMNS:
+        if column not in frame.columns:
+            continue
+        texts = format_column(frame[column], column, shorten_tank=True)
+        widths = [display_width(t) for t in texts]
+        out[column] = (
+            np.array(texts, dtype=object),
+            np.array(widths, dtype=np.int32)
+        )
+    return out
+
+
+def render_table(headers, columns, n_rows):
+    """
+    Aligned table lines from `headers` and, per column, (cells, widths).
+    Padding is done a column at a time.
+    """
+    rule = []
+    padded = []
+    for header, (cells, sizes) in zip(headers, columns):
+        header_size = display_width(header)
+        width = max(header_size, max(sizes, default=header_size))
+        rule.append("-" * width)
+        padded.append(
+            [header + " " * (width - header_size)]
+            + [v + " " * (width - w) for v, w in zip(cells, sizes)]
+        )
+    lines = [" " + " | ".join(row) + " " for row in zip(*padded)]
+    if not padded:
+        lines = ["  "] * (n_rows + 1)
+    return lines[:1] + ["-" + "-".join(rule) + " -"] + lines[1:]
+
+
+def frame_table(df, shorten_tank=True, display=None):
+    """
+    Table lines for `df`. With `display` (a snapshot's display_columns),
+    df's index must be the snapshot row positions; those columns are read
+    straight from the precomputed strings instead of being formatted.
+    """
+    positions = df.index.to_numpy() if display is not None else None
+    headers = [str(c) for c in df.columns]
+    columns = []
+    for i, column in enumerate(df.columns):
+        pre = display.get(column) if display is not None else None
+        if pre is not None and (column != "Tank" or shorten_tank):
+            texts, widths = pre
+            columns.append((texts[positions].tolist(), widths[positions].tolist()))
+            continue
+        cells = format_column(df.iloc[:, i], column, shorten_tank)
+        columns.append((cells, [display_width(v) for v in cells]))
+    return render_table(headers, columns, len(df))
@@ -0,0 +1,151 @@
+# router.py
+import re
+import time
+from collections import Counter
+
+PREFIX = "!o;"
+X_PREFIX = "x!"
+DATE_FILTER_RE = re.compile(r'([<>=]?)(\d{4}-\d{2}-\d{2}|\d{2}-\d{2}-\d{4})')
+GT_LETTERS = frozenset("arfl")
+
+
+def parse_date_filter(text):
+    """
+    '<2025-01-31', '>31-01-2025', '2025-01-31' ...
+    Returns (operator, "YYYY-MM-DD") or None.
+    """
+    match = DATE_FILTER_RE.fullmatch(text.strip())
+    if not match:
+        return None
+    operator, date_str = match.groups()
+    if len(date_str.split("-")[0]) == 2:
+        d, m, y = date_str.split("-")
+        date_str = f"{y}-{m}-{d}"
+    return operator, date_str
+
+
+def extract_gt(parts, valid=None):
+    """
+    Extract GT filter letter (A, R, F, etc.)
+    Returns (gt_letter or None)
+    """
+    if valid is None:
+        valid = GT_LETTERS
+
+    for p in parts:
+        p = p.strip().lower()
+        if len(p) == 1 and p in valid:
+            return p.upper()
+    return None
+
+
+class Route:
+    """
+    One registered command and what the dispatcher does around it.
+
+    gt:      honour the ;a / ;r / ;f / ;l GT addon
+    owner:   Tejm only
+    warm:    first page may come from the snapshot's pre-rendered pages
+    columns: table columns, for handlers that return rows
+    """
+
+    def __init__(self, prefix, name, handler, gt=False, owner=False,
+                 warm=False, columns=None):
+        self.prefix = prefix
+        self.name = name
+        self.handler = handler
+        self.gt = gt
+        self.owner = owner
+        self.warm = warm
+        self.columns = columns
+
+
+class Command:
+    """
+    A message, parsed once.
+
+    prefix: "!o;" or "x!"
+    name:   lowercase command ("p", "nt", ...); for x! "p", "t" or ""
+    parts:  content.split(";"), what the older handlers index into
+    arg:    first argument, stripped (for x! everything after x!p; etc.)
+    date:   (operator, "YYYY-MM-DD") from the first date addon, or None
+    gt:     GT letter when the route takes one, or None
+    route:  the registered Route, None for unknown commands
+    """
+
+    __slots__ = ("content", "prefix", "name", "parts", "arg", "date", "gt", "route")
+
+    def __init__(self, content, prefix, name, parts, arg, date=None):
+        self.content = content
+        self.prefix = prefix
+        self.name = name
+        self.parts = parts
+        self.arg = arg
+        self.date = date
+        self.gt = None
+        self.route = None
+
+
+def parse_command(content):
+    """Command for an !o; or x! message, None for anything else."""
+    if content.startswith(X_PREFIX):
+        raw = content[len(X_PREFIX):].strip()
+        name = ""
+        # x!p;Name / x!t;Name are what the lookup buttons send
+        if raw.startswith(("p;", "t;")):
+            name, raw = raw[0], raw[2:].strip()
+        return Command(content, X_PREFIX, name, content.split(";"), raw)
+
+    if content.startswith(PREFIX):
+        parts = content.split(";")
+        arg = parts[2].strip() if len(parts) > 2 else ""
+        date = None
+        for p in parts[2:]:  # skip cmd
+            date = parse_date_filter(p)
+            if date:
+                break  # only first date addon considered
+        return Command(content, PREFIX, parts[1].lower(), parts, arg, date)
+
+    return None
+
+
+class Router:
+    """
+    (prefix, name) -> Route. Handlers register with @router.command(...)
+    and the bot parses each message once with router.parse().
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.messages = 0
+        self.parse_seconds = 0.0
+        self.counts = Counter()
+
+    def command(self, prefix, *names, **flags):
+        def register(handler):
+            for name in names:
+                self.routes[(prefix, name)] = Route(prefix, name, handler, **flags)
+            return handler
+        return register
+
+    def parse(self, content):
+        t = time.perf_counter()
+        command = parse_command(content)
+        if command is not None:
+            route = self.routes.get((command.prefix, command.name))
+            command.route = route
+            if route is not None and route.gt:
+                command.gt = extract_gt(command.parts)
+            self.counts[f"{command.prefix}{command.name}"] += 1
+        self.messages += 1
+        self.parse_seconds += time.perf_counter() - t
+        return command
+
+    def stats(self):
+        avg = self.parse_seconds / self.messages if self.messages else 0.0
+        return {
+            "routes": len(self.routes),
+            "messages": self.messages,
+            "avg_parse_us": avg * 1e6,
+            "top": self.counts.most_common(3)
+        }
@@ -0,0 +1,427 @@
+# snapshot.py
+import os, json, hashlib, time
+import numpy as np
+import pandas as pd
+from vocab import Vocabulary
+from render import display_columns
+
+# Copy-on-Write lets every command share one frame: projections and
+# filters are lazy, and a write only copies the columns it touches.
+# Always on from pandas 3, opt-in before that.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# Binary copy of the workbook, next to the data it was built from.
+SNAPSHOT_DIR = "data/.snapshot"
+
+
+def file_sha1(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def source_key(path):
+    """size + mtime of the source file, cheap enough to check on every load."""
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _snapshot_paths(path, cache_dir):
+    base = os.path.splitext(os.path.basename(path))[0]
+    return (
+        os.path.join(cache_dir, f"{base}.pkl"),
+        os.path.join(cache_dir, f"{base}.json")
+    )
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, "r") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def _write_snapshot(df, pkl_path, meta_path, meta):
+    os.makedirs(os.path.dirname(pkl_path), exist_ok=True)
+    # Write to temp files first so a crash never leaves half a snapshot
+    tmp_pkl = pkl_path + ".tmp"
+    tmp_meta = meta_path + ".tmp"
+    df.to_pickle(tmp_pkl)
+    with open(tmp_meta, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_pkl, pkl_path)
+    os.replace(tmp_meta, meta_path)
+
+
+def load_workbook(path, cache_dir=SNAPSHOT_DIR):
+    """
+    Returns (df, source) for the first sheet of `path`.
+    source = "snapshot" when the binary copy was used,
+             "excel" when openpyxl had to parse the workbook.
+
+    The snapshot is keyed by size/mtime, and by sha1 when those change,
+    so touching the file without editing it does not force a re-parse.
+    """
+    pkl_path, meta_path = _snapshot_paths(path, cache_dir)
+    key = source_key(path)
+    meta = _read_meta(meta_path)
+
+    if meta and meta.get("pandas") == pd.__version__ and os.path.exists(pkl_path):
+        fresh = meta.get("size") == key["size"] and meta.get("mtime_ns") == key["mtime_ns"]
+        sha1 = None
+        if not fresh and meta.get("size") == key["size"]:
+            sha1 = file_sha1(path)
+            fresh = meta.get("sha1") == sha1
+        if fresh:
+            try:
+                df = pd.read_pickle(pkl_path)
+                if sha1 is not None:
+                    # Same content, new mtime: remember it for next time
+                    meta.update(key)
+                    with open(meta_path, "w") as f:
+                        json.dump(meta, f)
+                return df, "snapshot"
+            except Exception as e:
+                print("Snapshot load failed, re-reading Excel:", e)
+
+    df = pd.read_excel(path)
+    meta = {**key, "sha1": file_sha1(path), "pandas": pd.__version__}
+    try:
+        _write_snapshot(df, pkl_path, meta_path, meta)
+    except Exception as e:
+        print("Snapshot write failed:", e)
+    return df, "excel"
+
+
+def normalize_frame(df):
+    """
+    One cleaning pass at load time so handlers never re-clean:
+      Score        -> int64 (commas stripped, junk -> 0)
+      Date         -> datetime64 (unparseable -> NaT)
+      Name, Tank   -> stripped categoricals
+      name_key,
+      tank_key     -> lowercase categoricals for case-insensitive lookups
+    """
+    df = df.copy()
+    df.columns = df.columns.str.strip()
+
+    if "Score" in df.columns:
+        df["Score"] = (
+            pd.to_numeric(
+                df["Score"].astype(str).str.replace(",", ""),
+                errors="coerce"
+            )
+            .fillna(0)
+            .astype("int64")
+        )
+
+    if "Date" in df.columns:
+        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+
+    for col, key in (("Name", "name_key"), ("Tank", "tank_key")):
+        if col not in df.columns:
+            continue
+        values = df[col].where(df[col].isna(), df[col].astype(str).str.strip())
+        df[col] = values.astype("category")
+        df[key] = values.str.lower().astype("category")
+
+    return df
+
+
+# Fields the i/d/s embeds read, cached per Id
+RECORD_FIELDS = [
+    "Id", "Name", "Name in game", "Tank", "Killer", "Heal", "CDN",
+    "Description", "Score", "Playtime", "Date"
+]
+
+
+def index_ids(df):
+    """
+    Returns (id_rows, records):
+      id_rows  Id -> row position (first row wins, like the old .iloc[0])
+      records  Id -> {field: value} for RECORD_FIELDS
+    Ids are keyed as strings, the way users type them.
+    """
+    if "Id" not in df.columns:
+        return {}, {}
+    fields = [c for c in RECORD_FIELDS if c in df.columns]
+    rows = df[fields].to_dict("records")
+    id_rows = {}
+    records = {}
+    for pos, (raw, row) in enumerate(zip(df["Id"], rows)):
+        if pd.isna(raw):
+            continue
+        key = str(raw)
+        if key not in id_rows:
+            id_rows[key] = pos
+            records[key] = row
+    return id_rows, records
+
+
+NO_ROWS = np.empty(0, dtype=np.int64)
+
+
+def _group_positions(keys, order):
+    """
+    Split `order` (row positions) by the key of each row.
+    Returns {key: positions}, each array keeping the order of `order`.
+    """
+    codes, uniques = pd.factorize(keys[order])
+    if not len(uniques):
+        return {}
+    # factorize marks NaN keys as -1; stable sort keeps order inside groups
+    grouped = np.argsort(codes, kind="stable")
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    start = int((codes < 0).sum())
+    out = {}
+    for code, count in enumerate(counts):
+        out[uniques[code]] = order[grouped[start:start + count]]
+        start += count
+    return out
+
+
+def index_rows(df):
+    """
+    Row positions sorted by Score, highest first:
+      score_order              every row
+      player_rows[name_key]    one player's rows
+      tank_rows[tank_key]      one tank's rows
+      player_tank_rows[(name_key, tank_key)]
+    Ties keep sheet order.
+    """
+    if "Score" not in df.columns or "name_key" not in df.columns:
+        return np.arange(len(df)), {}, {}, {}
+    score_order = np.argsort(-df["Score"].to_numpy(), kind="stable")
+    names = df["name_key"].to_numpy(dtype=object)
+    tanks = df["tank_key"].to_numpy(dtype=object)
+    pairs = np.empty(len(df), dtype=object)
+    pairs[:] = [
+        (n, t) if isinstance(n, str) and isinstance(t, str) else None
+        for n, t in zip(names, tanks)
+    ]
+    return (
+        score_order,
+        _group_positions(names, score_order),
+        _group_positions(tanks, score_order),
+        _group_positions(pairs, score_order)
+    )
+
+
+def add_ranks(df, score_order):
+    """
+    Materialized leaderboard ranks:
+      LB       global position by Score (ties keep sheet order)
+      Tank LB  rank within the tank, ties share the better rank
+    """
+    if "Score" not in df.columns:
+        return df
+    lb = np.empty(len(df), dtype=np.int64)
+    lb[score_order] = np.arange(1, len(df) + 1)
+    tank_lb = (
+        df.groupby("Tank", observed=True)["Score"]
+          .rank(method="min", ascending=False)
+          .fillna(0)
+          .astype("int64")
+    )
+    return df.assign(**{"LB": lb, "Tank LB": tank_lb})
+
+
+def first_per(df, column, order):
+    """Positions from `order` keeping the first row of each `column` value."""
+    keys = pd.Series(df[column].to_numpy(dtype=object)[order])
+    return order[~keys.duplicated().to_numpy()]
+
+
+def player_totals(df):
+    """
+    Per-player aggregate, highest total first:
+      Name, Score (sum of every score), Fave (tank with the most entries)
+    """
+    named = df.dropna(subset=["Name"])
+    names = named["Name"].astype(str).rename("Name")
+    totals = named.groupby(names)["Score"].sum().reset_index()
+    uses = (
+        named.dropna(subset=["Tank"])
+             .groupby([names, named["Tank"].astype(str).rename("Fave")])
+             .size()
+             .reset_index(name="Uses")
+             .sort_values(["Name", "Uses"], ascending=[True, False], kind="stable")
+             .drop_duplicates("Name")
+    )
+    totals = totals.merge(uses[["Name", "Fave"]], on="Name", how="left")
+    totals["Fave"] = totals["Fave"].fillna("?")
+    return (
+        totals.sort_values("Score", ascending=False, kind="stable")
+              .reset_index(drop=True)
+    )
+
+
+def index_dates(df):
+    """
+    Returns (date_order, date_days): positions of rows with a valid Date,
+    sorted by day, and those days (datetime64[D]) in the same order.
+    """
+    if "Date" not in df.columns:
+        return NO_ROWS, np.empty(0, dtype="datetime64[D]")
+    days = df["Date"].to_numpy(dtype="datetime64[D]")
+    valid = np.flatnonzero(~np.isnat(days))
+    order = valid[np.argsort(days[valid], kind="stable")]
+    return order, days[order]
+
+
+def index_nu(df):
+    """
+    Returns (nu_order, nu_values): positions of rows with a numeric 'nu',
+    sorted ascending, and those nu values in the same order.
+    """
+    if "nu" not in df.columns:
+        return NO_ROWS, np.empty(0)
+    nu = pd.to_numeric(df["nu"], errors="coerce").to_numpy(dtype=float)
+    valid = np.flatnonzero(~np.isnan(nu))
+    order = valid[np.argsort(nu[valid], kind="stable")]
+    return order, nu[order]
+
+
+def index_gt(df):
+    """GT letter -> boolean row mask, one per letter in the sheet."""
+    if "GT" not in df.columns:
+        return {}
+    gt = df["GT"].astype(str).str.strip().str.upper().to_numpy()
+    return {letter: gt == letter for letter in pd.unique(gt)}
+
+
+def combine_masks(*masks):
+    """AND together boolean row masks, skipping None."""
+    out = None
+    for mask in masks:
+        if mask is None:
+            continue
+        out = mask if out is None else out & mask
+    return out
+
+
+class Snapshot:
+    """
+    One immutable load of the workbook. `frame` is shared by every
+    command, so treat it as read-only and derive new frames from it.
+    A reload builds a new Snapshot and swaps the reference; code that
+    already holds the old one keeps working on it until it is done.
+    """
+
+    def __init__(self, frame, version, key, source, build_seconds, branches=None):
+        self.version = version
+        self.key = key
+        self.source = source
+        self.build_seconds = build_seconds
+        self.id_rows, self.records = index_ids(frame)
+        (
+            self.score_order,
+            self.player_rows,
+            self.tank_rows,
+            self.player_tank_rows
+        ) = index_rows(frame)
+        self.date_order, self.date_days = index_dates(frame)
+        self.gt_masks = index_gt(frame)
+        self.nu_order, self.nu_values = index_nu(frame)
+        # Name/tank/branch lookups shared by every resolver
+        self.vocab = Vocabulary(frame, branches, self.records, version)
+        self.frame = add_ranks(frame, self.score_order)
+        # Table cells formatted once: column -> (strings, widths) per row
+        self.display = display_columns(self.frame)
+        # Aggregate boards, rebuilt only when the snapshot is
+        self.best_player_rows = first_per(frame, "Name", self.score_order)
+        self.best_tank_rows = first_per(frame, "Tank", self.score_order)
+        self.totals = player_totals(frame)
+
+    def ordered(self, mask=None):
+        """Every row position by Score, highest first, optionally masked."""
+        if mask is None:
+            return self.score_order
+        return self.score_order[mask[self.score_order]]
+
+    def date_mask(self, operator, day):
+        """
+        Boolean row mask for Date < / > / = `day` ("YYYY-MM-DD"),
+        found by binary search on the sorted dates.
+        """
+        mask = np.zeros(len(self.frame), dtype=bool)
+        try:
+            day = np.datetime64(day, "D")
+        except ValueError:
+            return mask
+        days = self.date_days
+        if operator == "<":
+            lo, hi = 0, np.searchsorted(days, day, side="left")
+        elif operator == ">":
+            lo, hi = np.searchsorted(days, day, side="right"), len(days)
+        else:  # "=" or None
+            lo = np.searchsorted(days, day, side="left")
+            hi = np.searchsorted(days, day, side="right")
+        mask[self.date_order[lo:hi]] = True
+        return mask
+
+    def nu_range(self, lo, hi=None, mask=None):
+        """
+        Positions with lo <= nu <= hi, in nu order. hi=None is open-ended,
+        which makes nu usable as an "added since" cursor.
+        """
+        start = np.searchsorted(self.nu_values, lo, side="left")
+        if hi is None:
+            end = len(self.nu_values)
+        else:
+            end = np.searchsorted(self.nu_values, hi, side="right")
+        positions = self.nu_order[start:end]
+        if mask is not None:
+            positions = positions[mask[positions]]
+        return positions
+
+    def gt_mask(self, letter):
+        """Boolean row mask for one GT letter (all False if unknown)."""
+        mask = self.gt_masks.get(letter.upper())
+        if mask is None:
+            return np.zeros(len(self.frame), dtype=bool)
+        return mask
+
+    def best_rows(self, column, mask=None):
+        """Positions of the best row per Name / Tank, highest first."""
+        if mask is None:
+            if column == "Name":
+                return self.best_player_rows
+            if column == "Tank":
+                return self.best_tank_rows
+        return first_per(self.frame, column, self.ordered(mask))
+
+    def positions_mask(self, positions):
+        """Boolean row mask that is True at `positions`."""
+        mask = np.zeros(len(self.frame), dtype=bool)
+        mask[positions] = True
+        return mask
+
+    def rows(self, positions, mask=None):
+        """Frame rows at `positions`, optionally narrowed by a boolean row mask."""
+        if mask is not None:
+            positions = positions[mask[positions]]
+        return self.frame.iloc[positions]
+
+
+def build_snapshot(path, version, cache_dir=SNAPSHOT_DIR, branches=None):
+    # key first: if the file changes mid-build the watcher sees it again
+    key = source_key(path)
+    t = time.perf_counter()
+    df, source = load_workbook(path, cache_dir=cache_dir)
+    df = normalize_frame(df)
+    return Snapshot(
+        df, version, key, source, time.perf_counter() - t, branches=branches
+    )
+
+
+def is_stale(snap, path):
+    try:
+        return snap is None or source_key(path) != snap.key
+    except OSError:
+        # File briefly missing while being replaced; try again next tick
+        return False
@@ -0,0 +1,153 @@
+# vocab.py
+from bisect import bisect_left
+from difflib import get_close_matches
+from fuzzy import FuzzyIndex, MATCH_CACHE
+
+
+class Completer:
+    """
+    Prefix search over a sorted array of lowercase keys, for slash-command
+    autocomplete. One bisect finds the first hit; the rest are adjacent.
+    """
+
+    def __init__(self, entries):
+        # entries: (key, label, value); label is what Discord shows
+        entries = sorted(entries)
+        self.keys = [key for key, _, _ in entries]
+        self.choices = [(label, value) for _, label, value in entries]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def complete(self, prefix, limit=25):
+        """Up to `limit` (label, value) pairs whose key starts with `prefix`."""
+        prefix = str(prefix).strip().lower()
+        i = bisect_left(self.keys, prefix)
+        out = []
+        while i < len(self.keys) and len(out) < limit:
+            if not self.keys[i].startswith(prefix):
+                break
+            out.append(self.choices[i])
+            i += 1
+        return out
+
+
+def id_label(record):
+    """'Qr · Tejm · Twin · 1,234,567' for the /info Id picker."""
+    parts = [str(record.get("Id", ""))]
+    for field in ("Name", "Tank"):
+        value = record.get(field)
+        if value is not None and value == value:
+            parts.append(str(value))
+    try:
+        parts.append(f"{int(record.get('Score', 0)):,}")
+    except (TypeError, ValueError):
+        pass
+    # Discord caps choice names at 100 characters
+    return " · ".join(parts)[:100]
+
+
+class Vocabulary:
+    """
+    Every name a command can be asked for, built once per snapshot.
+
+    names / tanks / branches: lowercase key -> display name
+    ambiguous:                keys that are both a player and a tank
+    kinds:                    key -> [("player", name), ("tank", name)]
+    *_fuzzy:                  FuzzyIndex over the same keys
+    *_complete:               Completer for slash-command autocomplete
+
+    Exact resolution is one dict lookup; only misses reach the fuzzy index.
+    resolve() / closest() are what every entry point (!o;, x!, slash)
+    uses to turn typed text into a name.
+    """
+
+    def __init__(self, frame, branches=None, records=None, version=None):
+        self.version = version
+        self.names = self._table(frame, "Name")
+        self.tanks = self._table(frame, "Tank")
+        # Branch keys keep their JSON spelling as the value
+        if isinstance(branches, dict):
+            self.branches = {str(b).lower(): b for b in branches}
+        else:
+            self.branches = {}
+        self.ambiguous = self.names.keys() & self.tanks.keys()
+        self.kinds = {}
+        for key, value in self.names.items():
+            self.kinds.setdefault(key, []).append(("player", value))
+        for key, value in self.tanks.items():
+            self.kinds.setdefault(key, []).append(("tank", value))
+        # Repeat typos are answered from MATCH_CACHE until the next reload
+        self.name_fuzzy = self._fuzzy(self.names, "Name")
+        self.tank_fuzzy = self._fuzzy(self.tanks, "Tank")
+        self.any_fuzzy = self._fuzzy(list(self.names) + list(self.tanks), "Any")
+        self.branch_fuzzy = self._fuzzy(self.branches, "Branch")
+        self.player_complete = Completer((k, v, v) for k, v in self.names.items())
+        self.tank_complete = Completer((k, v, v) for k, v in self.tanks.items())
+        self.branch_complete = Completer(
+            (k, str(v), str(v)) for k, v in self.branches.items()
+        )
+        # Ids are case-sensitive when looked up, but typed in any case
+        self.id_complete = Completer(
+            (i.lower(), id_label(r), i) for i, r in (records or {}).items()
+        )
+        # Kept for lookups limited to filtered rows
+        self.frame = frame
+
+    def _fuzzy(self, words, kind):
+        return FuzzyIndex(
+            words, cache=MATCH_CACHE, cache_key=(self.version, kind)
+        )
+
+    @staticmethod
+    def _table(frame, column, mask=None):
+        if column not in frame.columns:
+            return {}
+        values = frame[column] if mask is None else frame[column][mask]
+        # Same as {str(v).lower(): str(v)} over unique(): last spelling wins
+        return {str(v).lower(): str(v) for v in values.dropna().unique()}
+
+    def player(self, query):
+        return self.names.get(str(query).strip().lower())
+
+    def tank(self, query):
+        return self.tanks.get(str(query).strip().lower())
+
+    def table(self, column, mask=None):
+        """key -> display for `column`, only names present in the masked rows."""
+        if column == "Branch":
+            return self.branches
+        if mask is None:
+            return self.names if column == "Name" else self.tanks
+        return self._table(self.frame, column, mask)
+
+    def index(self, column, mask=None):
+        """FuzzyIndex for `column`, or None when the rows are filtered."""
+        if column == "Branch":
+            return self.branch_fuzzy
+        if mask is not None:
+            return None
+        return self.name_fuzzy if column == "Name" else self.tank_fuzzy
+
+    def resolve(self, column, query, mask=None, n=5, cutoff=0.65):
+        """
+        (display, []) for an exact hit, else (None, close keys best first).
+        column is "Name", "Tank" or "Branch".
+        """
+        table = self.table(column, mask)
+        key = str(query).strip().lower()
+        value = table.get(key)
+        if value is not None:
+            return value, []
+        index = self.index(column, mask)
+        if index is not None:
+            return None, index.close_matches(key, n=n, cutoff=cutoff)
+        # Filtered rows: plain difflib over the names left
+        return None, get_close_matches(key, table.keys(), n=n, cutoff=cutoff)
+
+    def closest(self, column, query, mask=None, cutoff=0.65):
+        """Exact hit, else the single closest name, else None."""
+        value, matches = self.resolve(column, query, mask, n=1, cutoff=cutoff)
+        if value is None and matches:
+            value = self.table(column, mask)[matches[0]]
+        return value